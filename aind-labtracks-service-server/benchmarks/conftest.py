@@ -0,0 +1,96 @@
+"""Set up fixtures to be used across all benchmark modules."""
+
+import json
+import os
+import statistics
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks.synthetic import (
+    RESOURCES_DIR,
+    TABLES,
+    generate_labtracks_rows,
+    load_labtracks_rows,
+)
+
+# Size of the synthetic dataset. Override with environment variables to
+# benchmark against larger volumes.
+BENCH_SUBJECTS = int(os.getenv("BENCH_SUBJECTS", "1000"))
+BENCH_TASKS_PER_SUBJECT = int(os.getenv("BENCH_TASKS_PER_SUBJECT", "10"))
+
+# Latency percentiles of each benchmark, reported at the end of the run
+PERCENTILES = {}
+
+
+def _create_engine():
+    """Create an in-memory sqlite engine with the LabTracks tables."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def labtracks_session():
+    """Generate a sqlite database loaded with the test data."""
+    engine = _create_engine()
+    with open(RESOURCES_DIR / "test_db.json", "r") as f:
+        test_db = json.load(f)
+    with Session(engine) as session:
+        for table_name, model in TABLES.items():
+            for row in test_db[table_name]:
+                session.add(model.model_validate(row))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def synthetic_session():
+    """Generate a sqlite database loaded with a synthetic dataset."""
+    engine = _create_engine()
+    rows = generate_labtracks_rows(
+        n_subjects=BENCH_SUBJECTS, tasks_per_subject=BENCH_TASKS_PER_SUBJECT
+    )
+    with Session(engine) as session:
+        load_labtracks_rows(session, rows)
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def record_percentiles(request):
+    """
+    Add p50 and p99 latencies to each benchmark's extra info, so they are
+    saved with --benchmark-json or --benchmark-autosave and can be tracked
+    over time.
+    """
+    yield
+    benchmark = request.node.funcargs.get("benchmark")
+    if benchmark is None or benchmark.stats is None:
+        return
+    data = benchmark.stats.stats.data
+    if len(data) < 2:
+        return
+    quantiles = statistics.quantiles(data, n=100, method="inclusive")
+    benchmark.extra_info["p50"] = quantiles[49]
+    benchmark.extra_info["p99"] = quantiles[98]
+    PERCENTILES[request.node.name] = (quantiles[49], quantiles[98])
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the latency percentiles of each benchmark."""
+    if not PERCENTILES:
+        return
+    terminalreporter.section("latency percentiles (us)")
+    width = max(len(name) for name in PERCENTILES)
+    terminalreporter.write_line(f"{'Name':<{width}}  {'p50':>10}  {'p99':>10}")
+    for name, (p50, p99) in PERCENTILES.items():
+        terminalreporter.write_line(
+            f"{name:<{width}}  {p50 * 1e6:>10.1f}  {p99 * 1e6:>10.1f}"
+        )
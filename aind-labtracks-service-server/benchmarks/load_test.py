@@ -0,0 +1,328 @@
+"""
+Load test the app against a seeded sqlite database. The app is served by
+uvicorn in a background thread with get_session overridden to read from a
+file-backed sqlite copy of the synthetic dataset. Concurrent asyncio workers
+then send a mix of requests for a fixed duration, and a summary of the
+throughput and latency percentiles is printed. The driver shares the
+process with the server, so the numbers are a lower bound for what a pod
+serves. They are best compared between runs on the same machine.
+Run with: python -m benchmarks.load_test --scenario mixed --concurrency 32
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+import uvicorn
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel, create_engine
+
+from aind_labtracks_service_server.main import app
+from aind_labtracks_service_server.session import get_session
+from benchmarks.synthetic import (
+    FIRST_SUBJECT_ID,
+    generate_labtracks_rows,
+    load_labtracks_rows,
+)
+
+# The session is overridden, so the LabTracks connection settings are only
+# placeholders needed to start the app.
+PLACEHOLDER_SETTINGS = {
+    "LABTRACKS_HOST": "localhost",
+    "LABTRACKS_PORT": "1433",
+    "LABTRACKS_DATABASE": "labtracks",
+    "LABTRACKS_USER": "load_test",
+    "LABTRACKS_PASSWORD": "load_test",
+}
+
+
+def _subject(rng: random.Random, subject_ids: List[int]) -> str:
+    """Path for a single subject."""
+    return f"/subject/{rng.choice(subject_ids)}"
+
+
+def _tasks(rng: random.Random, subject_ids: List[int]) -> str:
+    """Path for the tasks of a single subject."""
+    return f"/tasks/{rng.choice(subject_ids)}"
+
+
+def _subjects_bulk(rng: random.Random, subject_ids: List[int]) -> str:
+    """Path for 20 subjects at once."""
+    query = "&".join(f"subject_ids={i}" for i in rng.sample(subject_ids, 20))
+    return f"/subjects?{query}"
+
+
+# Each scenario is a list of (weight, path factory) pairs
+SCENARIOS: Dict[str, List[tuple]] = {
+    "subjects": [(1, _subject)],
+    "tasks": [(1, _tasks)],
+    "mixed": [(7, _subject), (3, _tasks)],
+    "bulk": [(8, _subject), (1, _tasks), (1, _subjects_bulk)],
+}
+
+
+@dataclass
+class LoadTestResult:
+    """Latencies and errors of the requests sent during a load test"""
+
+    duration: float = 0.0
+    latencies: Dict[str, List[float]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+def seed_database(
+    path: Path, n_subjects: int, tasks_per_subject: int, rebuild: bool
+) -> None:
+    """
+    Write the synthetic dataset to a sqlite file, unless it already exists.
+    Parameters
+    ----------
+    path : Path
+      Location of the sqlite file.
+    n_subjects : int
+      Number of subjects to generate.
+    tasks_per_subject : int
+      Number of tasks to generate per subject.
+    rebuild : bool
+      Whether to replace an existing file.
+    """
+    if path.exists() and not rebuild:
+        return
+    path.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    rows = generate_labtracks_rows(
+        n_subjects=n_subjects, tasks_per_subject=tasks_per_subject
+    )
+    with Session(engine) as session:
+        load_labtracks_rows(session, rows)
+    engine.dispose()
+
+
+def override_session(path: Path, pool_size: int) -> None:
+    """
+    Point the app's get_session dependency at a sqlite file.
+    Parameters
+    ----------
+    path : Path
+      Location of the sqlite file.
+    pool_size : int
+      Number of sqlite connections to keep open.
+    """
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+    )
+    session_local = sessionmaker(
+        bind=engine, class_=Session, expire_on_commit=False
+    )
+
+    def get_sqlite_session():
+        """Yield a session reading the sqlite file."""
+        session = session_local()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_session] = get_sqlite_session
+
+
+def start_server(port: int) -> uvicorn.Server:
+    """
+    Serve the app with uvicorn in a background thread.
+    Parameters
+    ----------
+    port : int
+      Local port to listen on.
+
+    Returns
+    -------
+    uvicorn.Server
+      Running server. Set should_exit to stop it.
+
+    """
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_load(
+    base_url: str,
+    scenario: List[tuple],
+    subject_ids: List[int],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> LoadTestResult:
+    """
+    Send requests from concurrent workers until the duration has passed.
+    Parameters
+    ----------
+    base_url : str
+      Url the app is served at.
+    scenario : List[tuple]
+      Weighted path factories to pick requests from.
+    subject_ids : List[int]
+      Subject ids that exist in the database.
+    concurrency : int
+      Number of requests in flight at a time.
+    duration : float
+      Number of seconds to send requests for.
+    seed : int
+      Seed for picking requests, so runs are reproducible.
+
+    Returns
+    -------
+    LoadTestResult
+
+    """
+    weights = [weight for weight, _ in scenario]
+    factories: List[Callable] = [factory for _, factory in scenario]
+    result = LoadTestResult()
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+
+        async def worker(worker_id: int):
+            """Send requests one after another until the deadline."""
+            rng = random.Random(seed + worker_id)
+            while time.perf_counter() < deadline:
+                factory = rng.choices(factories, weights=weights)[0]
+                name = factory.__name__.lstrip("_")
+                sent = time.perf_counter()
+                try:
+                    response = await client.get(factory(rng, subject_ids))
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    result.latencies[name].append(time.perf_counter() - sent)
+                else:
+                    result.errors[name] += 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        result.duration = time.perf_counter() - start
+    return result
+
+
+def format_report(result: LoadTestResult) -> str:
+    """
+    Summarize the throughput and latency percentiles of a load test.
+    Parameters
+    ----------
+    result : LoadTestResult
+
+    Returns
+    -------
+    str
+
+    """
+    lines = [
+        f"{'Request':<16}{'Count':>8}{'Errors':>8}{'RPS':>10}"
+        f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'Max ms':>10}"
+    ]
+    names = sorted(set(result.latencies) | set(result.errors))
+    all_latencies = [t for name in names for t in result.latencies[name]]
+    rows = [
+        (name, result.latencies[name], result.errors[name]) for name in names
+    ]
+    rows.append(("total", all_latencies, sum(result.errors.values())))
+    for name, latencies, errors in rows:
+        if len(latencies) >= 2:
+            q = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p90, p99 = q[49], q[89], q[98]
+        else:
+            p50 = p90 = p99 = latencies[0] if latencies else 0.0
+        lines.append(
+            f"{name:<16}{len(latencies):>8}{errors:>8}"
+            f"{len(latencies) / result.duration:>10.1f}"
+            f"{p50 * 1000:>10.2f}{p90 * 1000:>10.2f}{p99 * 1000:>10.2f}"
+            f"{max(latencies, default=0.0) * 1000:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    """Seed the database, serve the app and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--subjects", type=int, default=1000)
+    parser.add_argument("--tasks-per-subject", type=int, default=10)
+    parser.add_argument(
+        "--database",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "labtracks_load_test.db",
+    )
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the response caches so every request queries sqlite.",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    seed_database(
+        args.database, args.subjects, args.tasks_per_subject, args.rebuild
+    )
+    # Settings are loaded when the server starts, so env set here applies
+    for name, value in PLACEHOLDER_SETTINGS.items():
+        os.environ.setdefault(name, value)
+    if args.no_cache:
+        os.environ["LABTRACKS_SUBJECT_CACHE_TTL"] = "0"
+        os.environ["LABTRACKS_TASK_CACHE_TTL"] = "0"
+    # The app logs at INFO, so each request would otherwise log a line from
+    # the client and the access log, which skews the results
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+    override_session(args.database, pool_size=args.concurrency)
+    server = start_server(args.port)
+    subject_ids = list(
+        range(FIRST_SUBJECT_ID, FIRST_SUBJECT_ID + args.subjects)
+    )
+    try:
+        result = asyncio.run(
+            run_load(
+                base_url=f"http://127.0.0.1:{args.port}",
+                scenario=SCENARIOS[args.scenario],
+                subject_ids=subject_ids,
+                concurrency=args.concurrency,
+                duration=args.duration,
+                seed=args.seed,
+            )
+        )
+    finally:
+        server.should_exit = True
+    print(
+        f"scenario={args.scenario} concurrency={args.concurrency} "
+        f"duration={result.duration:.1f}s cache={not args.no_cache}"
+    )
+    print(format_report(result))
+
+
+if __name__ == "__main__":
+    main()
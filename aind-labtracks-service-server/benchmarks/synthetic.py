@@ -0,0 +1,198 @@
+"""
+Generate a synthetic LabTracks dataset of a realistic size. Rows are copies
+of the rows in tests/resources/test_db.json with new ids, foreign keys,
+timestamps and MouseCustomClass xml, so every column the views read is
+populated the way it is in LabTracks.
+"""
+
+import json
+import os
+import random
+from copy import deepcopy
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from aind_labtracks_service_server.models import (
+    AcucProtocol,
+    AnimalsCommon,
+    Groups,
+    Species,
+    TaskSet,
+    TaskSetObject,
+    TaskType,
+)
+
+RESOURCES_DIR = (
+    Path(os.path.dirname(os.path.realpath(__file__))).parent
+    / "tests"
+    / "resources"
+)
+
+TABLES = {
+    "species": Species,
+    "groups": Groups,
+    "animals_common": AnimalsCommon,
+    "task_type": TaskType,
+    "acuc_protocol": AcucProtocol,
+    "task_set": TaskSet,
+    "task_set_object": TaskSetObject,
+}
+
+FIRST_SUBJECT_ID = 700000
+FIRST_GROUP_ID = 9000000
+FIRST_TASK_ID = 3000000
+FIRST_TASK_OBJECT_ID = 4000000
+
+GENOTYPES = [
+    "Pvalb-IRES-Cre/wt;RCL-somBiPoles_mCerulean-WPRE/wt",
+    "Sst-IRES-Cre/wt;Ai14(RCL-tdT)/wt",
+    "Vip-IRES-Cre/wt",
+    "wt/wt",
+    "Slc17a7-IRES2-Cre/wt;Ai93(TITL-GCaMP6f)/wt",
+]
+SOLUTIONS = ["1xPBS", "Saline", None]
+TASK_STATUSES = ["F", "P", "S"]
+
+MOUSE_CUSTOM_CLASS_XML = (
+    '<?xml version="1.0" encoding="utf-16"?>\r\n'
+    "<MouseCustomClass"
+    ' xmlns:xsd="http://www.w3.org/2001/XMLSchema"'
+    ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\r\n'
+    "  <Reserved_by>{reserved_by}</Reserved_by>\r\n"
+    "  <Reserve_Date>{reserve_date}</Reserve_Date>\r\n"
+    "{solution}"
+    "  <Full_Genotype>{genotype}</Full_Genotype>\r\n"
+    "  <Phenotype>{phenotype}</Phenotype>\r\n"
+    "</MouseCustomClass>"
+)
+
+
+def _mouse_custom_class_xml(rng: random.Random, reserve_date: datetime):
+    """Render a MouseCustomClass xml string with random values."""
+    solution = rng.choice(SOLUTIONS)
+    return MOUSE_CUSTOM_CLASS_XML.format(
+        reserved_by=f"Person {rng.choice('ABCDEFGH')}",
+        reserve_date=reserve_date.strftime("%Y-%m-%dT00:00:00-07:00"),
+        solution=(
+            ""
+            if solution is None
+            else f"  <Solution>{solution}</Solution>\r\n"
+        ),
+        genotype=rng.choice(GENOTYPES),
+        phenotype=f"P{rng.randint(10, 90)}: {rng.uniform(3, 30):.2f}g.",
+    )
+
+
+def generate_labtracks_rows(
+    n_subjects: int = 1000,
+    tasks_per_subject: int = 10,
+    n_groups: int = 50,
+    seed: int = 0,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate rows for each LabTracks table used by the views.
+    Parameters
+    ----------
+    n_subjects : int
+      Number of AnimalsCommon rows. Subjects after the first two have
+      parents among the earlier subjects.
+    tasks_per_subject : int
+      Number of TaskSet rows linked to each subject.
+    n_groups : int
+      Number of Groups rows the subjects are spread over.
+    seed : int
+      Seed for the random values, so the dataset is reproducible.
+
+    Returns
+    -------
+    Dict[str, List[Dict[str, Any]]]
+      Rows keyed by the table names used in test_db.json.
+
+    """
+    with open(RESOURCES_DIR / "test_db.json", "r") as f:
+        templates = json.load(f)
+    rng = random.Random(seed)
+    epoch = datetime(2020, 1, 1)
+    rows = {
+        "species": templates["species"],
+        "task_type": templates["task_type"],
+        "acuc_protocol": templates["acuc_protocol"],
+        "groups": [],
+        "animals_common": [],
+        "task_set": [],
+        "task_set_object": [],
+    }
+    for index in range(n_groups):
+        group = deepcopy(templates["groups"][index % 2])
+        group["id"] = FIRST_GROUP_ID + index
+        group["group_name"] = f"Exp-{index:04d}"
+        group["group_description"] = f"Synthetic group {index}"
+        group["row_modified"] = epoch + timedelta(days=rng.randint(0, 1500))
+        rows["groups"].append(group)
+    task_type_ids = [t["id"] for t in templates["task_type"]]
+    link_index = templates["acuc_protocol"][0]["link_index"]
+    task_id = FIRST_TASK_ID
+    for index in range(n_subjects):
+        subject_id = FIRST_SUBJECT_ID + index
+        birth_date = epoch + timedelta(days=rng.randint(0, 1500))
+        subject = deepcopy(templates["animals_common"][index % 3])
+        subject["id"] = subject_id
+        subject["birth_date"] = birth_date
+        subject["row_modified"] = birth_date + timedelta(
+            days=rng.randint(0, 200)
+        )
+        subject["sex"] = rng.choice(["M", "F"])
+        subject["group_id"] = FIRST_GROUP_ID + rng.randrange(n_groups)
+        subject["class_values"] = _mouse_custom_class_xml(
+            rng, birth_date + timedelta(days=30)
+        )
+        if index >= 2:
+            subject["paternal_index"] = FIRST_SUBJECT_ID + rng.randrange(index)
+            subject["maternal_index"] = FIRST_SUBJECT_ID + rng.randrange(index)
+        else:
+            subject["paternal_index"] = None
+            subject["maternal_index"] = None
+        rows["animals_common"].append(subject)
+        for _ in range(tasks_per_subject):
+            date_start = birth_date + timedelta(hours=rng.randint(24, 5000))
+            task = deepcopy(templates["task_set"][0])
+            task["id"] = task_id
+            task["task_type_id"] = rng.choice(task_type_ids)
+            task["acuc_link_id"] = link_index
+            task["date_start"] = date_start
+            task["date_end"] = date_start + timedelta(minutes=30)
+            task["task_status"] = rng.choice(TASK_STATUSES)
+            task["row_modified"] = date_start + timedelta(hours=1)
+            rows["task_set"].append(task)
+            task_object = deepcopy(templates["task_set_object"][0])
+            task_object["id"] = FIRST_TASK_OBJECT_ID + task_id
+            task_object["task_id"] = task_id
+            task_object["task_object"] = subject_id
+            task_object["row_modified"] = date_start + timedelta(hours=1)
+            rows["task_set_object"].append(task_object)
+            task_id += 1
+    return rows
+
+
+def load_labtracks_rows(
+    session: Session, rows: Dict[str, List[Dict[str, Any]]]
+) -> None:
+    """
+    Insert generated rows into a database with the LabTracks tables.
+    Parameters
+    ----------
+    session : Session
+      Session bound to a database the tables were created in.
+    rows : Dict[str, List[Dict[str, Any]]]
+      Rows keyed by table name, as returned by generate_labtracks_rows.
+    """
+    for table_name, model in TABLES.items():
+        values = [
+            model.model_validate(r).model_dump() for r in rows[table_name]
+        ]
+        session.execute(insert(model), values)
+    session.commit()
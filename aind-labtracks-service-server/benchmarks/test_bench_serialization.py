@@ -0,0 +1,81 @@
+"""
+Compare the cost per row of rendering a list of tasks as JSON:
+- jsonable_encoder and json.dumps, used by FastAPI before 0.130
+- dumping to Python with pydantic and rendering with orjson, as
+  ORJSONResponse does
+- validating against the response model and dumping straight to JSON bytes
+  with pydantic-core, used by FastAPI since 0.130
+- dumping already validated models, as the cached endpoints do
+Decimal fields are rendered as strings in every case.
+Run with: pytest benchmarks/test_bench_serialization.py
+"""
+
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from aind_labtracks_service_server.models import Task
+
+N_ROWS = 1000
+
+TASKS = [
+    Task(
+        id=Decimal(3000000 + i),
+        type_name="Surgery",
+        date_start=datetime(2021, 1, 1) + timedelta(hours=i),
+        date_end=datetime(2021, 1, 1, 1) + timedelta(hours=i),
+        investigator_id=Decimal(30046),
+        task_description="Adjust all tasks associated with the litter.",
+        task_object=Decimal(700000 + i // 10),
+        protocol_number="2116",
+        protocol_title="Mouse Breeding",
+        task_status="F",
+    )
+    for i in range(N_ROWS)
+]
+TASKS_ADAPTER = TypeAdapter(List[Task])
+EXPECTED = json.loads(TASKS_ADAPTER.dump_json(TASKS))
+
+
+def _check(benchmark, content: bytes):
+    """Check the output and record the cost per row."""
+    assert EXPECTED == json.loads(content)
+    if benchmark.stats is None:
+        return
+    benchmark.extra_info["us_per_row"] = (
+        benchmark.stats.stats.median * 1e6 / N_ROWS
+    )
+
+
+def test_serialize_jsonable_encoder(benchmark):
+    """jsonable_encoder followed by json.dumps."""
+    content = benchmark(lambda: json.dumps(jsonable_encoder(TASKS)).encode())
+    _check(benchmark, content)
+
+
+def test_serialize_orjson(benchmark):
+    """Pydantic dump to JSON compatible Python followed by orjson."""
+    orjson = pytest.importorskip("orjson")
+    content = benchmark(
+        lambda: orjson.dumps(TASKS_ADAPTER.dump_python(TASKS, mode="json"))
+    )
+    _check(benchmark, content)
+
+
+def test_serialize_validate_dump_json(benchmark):
+    """Validate against the response model and dump to JSON bytes."""
+    content = benchmark(
+        lambda: TASKS_ADAPTER.dump_json(TASKS_ADAPTER.validate_python(TASKS))
+    )
+    _check(benchmark, content)
+
+
+def test_serialize_dump_json(benchmark):
+    """Dump already validated models to JSON bytes."""
+    content = benchmark(TASKS_ADAPTER.dump_json, TASKS)
+    _check(benchmark, content)
@@ -0,0 +1,77 @@
+"""
+Compare the per-request Python overhead of building the view statements on
+every call against executing the statements prebuilt in the handler module.
+Run with: pytest benchmarks/test_bench_statements.py
+"""
+
+from aind_labtracks_service_server.handler import (
+    SUBJECT_VIEW_STATEMENT,
+    TASK_VIEW_STATEMENT,
+    _subject_view_statement,
+    _task_view_statement,
+)
+
+SUBJECT_ID = 632269
+
+
+def test_subject_statement_rebuilt(benchmark, labtracks_session):
+    """Build the aliases and join graph for every request."""
+
+    def run():
+        """Build and execute the statement."""
+        statement = _subject_view_statement(lambda ac: ac.id == SUBJECT_ID)
+        return labtracks_session.execute(statement).all()
+
+    assert 1 == len(benchmark(run))
+
+
+def test_subject_statement_rebuilt_uncached(benchmark, labtracks_session):
+    """Build and recompile the statement for every request."""
+    connection = (
+        labtracks_session.get_bind()
+        .connect()
+        .execution_options(compiled_cache=None)
+    )
+
+    def run():
+        """Build and execute the statement without the SQL cache."""
+        statement = _subject_view_statement(lambda ac: ac.id == SUBJECT_ID)
+        return connection.execute(statement).all()
+
+    assert 1 == len(benchmark(run))
+    connection.close()
+
+
+def test_subject_statement_prebuilt(benchmark, labtracks_session):
+    """Execute the prebuilt statement with a bound subject id."""
+
+    def run():
+        """Execute the statement."""
+        return labtracks_session.execute(
+            SUBJECT_VIEW_STATEMENT, {"subject_id": SUBJECT_ID}
+        ).all()
+
+    assert 1 == len(benchmark(run))
+
+
+def test_task_statement_rebuilt(benchmark, labtracks_session):
+    """Build the aliases and join graph for every request."""
+
+    def run():
+        """Build and execute the statement."""
+        statement = _task_view_statement(lambda ac: ac.id == SUBJECT_ID)
+        return labtracks_session.execute(statement).all()
+
+    assert 1 == len(benchmark(run))
+
+
+def test_task_statement_prebuilt(benchmark, labtracks_session):
+    """Execute the prebuilt statement with a bound subject id."""
+
+    def run():
+        """Execute the statement."""
+        return labtracks_session.execute(
+            TASK_VIEW_STATEMENT, {"subject_id": SUBJECT_ID}
+        ).all()
+
+    assert 1 == len(benchmark(run))
@@ -0,0 +1,146 @@
+"""
+Measure the subject and task views against the synthetic dataset at three
+levels: the endpoints through the app, the handler alone and pydantic
+validation alone. The response caches are disabled, so every endpoint call
+runs the query.
+Run with: pytest benchmarks/test_bench_views.py
+Set BENCH_SUBJECTS and BENCH_TASKS_PER_SUBJECT to change the dataset size.
+"""
+
+from itertools import cycle
+
+import pytest
+from fastapi.testclient import TestClient
+
+from aind_labtracks_service_server import route
+from aind_labtracks_service_server.cache import ResponseCache
+from aind_labtracks_service_server.handler import (
+    SUBJECT_VIEWS_STATEMENT,
+    TASK_VIEWS_STATEMENT,
+    SessionHandler,
+)
+from aind_labtracks_service_server.main import app
+from aind_labtracks_service_server.models import (
+    Subject,
+    Task,
+    parse_mouse_custom_class,
+)
+from aind_labtracks_service_server.session import get_session
+from benchmarks.conftest import BENCH_SUBJECTS
+from benchmarks.synthetic import FIRST_SUBJECT_ID
+
+SUBJECT_IDS = list(range(FIRST_SUBJECT_ID, FIRST_SUBJECT_ID + BENCH_SUBJECTS))
+# Number of subjects whose rows are validated per round
+VALIDATION_BATCH_SIZE = 100
+
+
+@pytest.fixture
+def client(synthetic_session, monkeypatch):
+    """App client reading the synthetic dataset with caches disabled."""
+    caches = {name: ResponseCache(0, 0) for name in route.get_caches()}
+    monkeypatch.setattr(route, "get_caches", lambda: caches)
+    app.dependency_overrides[get_session] = lambda: synthetic_session
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+def test_endpoint_subject(benchmark, client):
+    """GET /subject/{subject_id} for a different subject each call."""
+    subject_ids = cycle(SUBJECT_IDS)
+
+    def run():
+        """Request the next subject."""
+        return client.get(f"/subject/{next(subject_ids)}")
+
+    assert 200 == benchmark(run).status_code
+
+
+def test_endpoint_tasks(benchmark, client):
+    """GET /tasks/{subject_id} for a different subject each call."""
+    subject_ids = cycle(SUBJECT_IDS)
+
+    def run():
+        """Request the tasks of the next subject."""
+        return client.get(f"/tasks/{next(subject_ids)}")
+
+    assert 200 == benchmark(run).status_code
+
+
+def test_handler_subject_view(benchmark, synthetic_session):
+    """SessionHandler.get_subject_view without the app."""
+    handler = SessionHandler(synthetic_session)
+    subject_ids = cycle(SUBJECT_IDS)
+
+    def run():
+        """Query the next subject."""
+        return handler.get_subject_view(next(subject_ids))
+
+    assert 1 == len(benchmark(run))
+
+
+def test_handler_task_view(benchmark, synthetic_session):
+    """SessionHandler.get_task_view without the app."""
+    handler = SessionHandler(synthetic_session)
+    subject_ids = cycle(SUBJECT_IDS)
+
+    def run():
+        """Query the tasks of the next subject."""
+        return handler.get_task_view(next(subject_ids))
+
+    assert 0 < len(benchmark(run))
+
+
+def test_handler_subject_views_bulk(benchmark, synthetic_session):
+    """SessionHandler.get_subject_views for every subject at once."""
+    handler = SessionHandler(synthetic_session)
+    subjects = benchmark(handler.get_subject_views, SUBJECT_IDS)
+    assert BENCH_SUBJECTS == len(subjects)
+
+
+def test_validate_subjects(benchmark, synthetic_session):
+    """Validate subject rows with the xml memo cleared before each round."""
+    rows = synthetic_session.execute(
+        SUBJECT_VIEWS_STATEMENT,
+        {"subject_ids": SUBJECT_IDS[:VALIDATION_BATCH_SIZE]},
+    ).all()
+
+    def run():
+        """Validate every row."""
+        return [Subject.model_validate(r) for r in rows]
+
+    subjects = benchmark.pedantic(
+        run, setup=parse_mouse_custom_class.cache_clear, rounds=50
+    )
+    benchmark.extra_info["rows"] = len(rows)
+    assert len(rows) == len(subjects)
+
+
+def test_validate_subjects_memoized(benchmark, synthetic_session):
+    """Validate subject rows whose xml has been parsed before."""
+    rows = synthetic_session.execute(
+        SUBJECT_VIEWS_STATEMENT,
+        {"subject_ids": SUBJECT_IDS[:VALIDATION_BATCH_SIZE]},
+    ).all()
+
+    def run():
+        """Validate every row."""
+        return [Subject.model_validate(r) for r in rows]
+
+    benchmark.extra_info["rows"] = len(rows)
+    assert len(rows) == len(benchmark(run))
+
+
+def test_validate_tasks(benchmark, synthetic_session):
+    """Validate task rows."""
+    rows = synthetic_session.execute(
+        TASK_VIEWS_STATEMENT,
+        {"subject_ids": SUBJECT_IDS[:VALIDATION_BATCH_SIZE]},
+    ).all()
+
+    def run():
+        """Validate every row."""
+        return [Task.model_validate(r) for r in rows]
+
+    benchmark.extra_info["rows"] = len(rows)
+    assert len(rows) == len(benchmark(run))
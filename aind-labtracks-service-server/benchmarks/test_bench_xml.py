@@ -0,0 +1,74 @@
+"""
+Compare parsing MouseCustomClass xml strings with pydantic-xml against the
+fast single pass parser, with and without memoization.
+Run with: pytest benchmarks/test_bench_xml.py
+"""
+
+from aind_labtracks_service_server.models import (
+    MouseCustomClass,
+    Subject,
+    _fast_parse_mouse_custom_class,
+    parse_mouse_custom_class,
+)
+
+XML_STRING = (
+    '<?xml version="1.0" encoding="utf-16"?>\r\n'
+    "<MouseCustomClass"
+    ' xmlns:xsd="http://www.w3.org/2001/XMLSchema"'
+    ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\r\n'
+    "  <Reserved_by>Person A</Reserved_by>\r\n"
+    "  <Reserve_Date>2022-07-14T00:00:00-07:00</Reserve_Date>\r\n"
+    "  <Solution>1xPBS</Solution>\r\n"
+    "  <Full_Genotype>Pvalb-IRES-Cre/wt</Full_Genotype>\r\n"
+    "  <Phenotype>P19: TSTW. Small body, large head. </Phenotype>\r\n"
+    "</MouseCustomClass>"
+)
+
+SUBJECT_ROW = {
+    "id": 632269,
+    "class_values": XML_STRING,
+    "paternal_id": 623236,
+    "paternal_class_values": XML_STRING.replace("Person A", "Person B"),
+    "maternal_id": 615310,
+    "maternal_class_values": XML_STRING.replace("Person A", "Person C"),
+}
+
+
+def test_xml_pydantic_xml(benchmark):
+    """Parse with pydantic-xml."""
+    assert (
+        "Person A"
+        == benchmark(MouseCustomClass.from_xml, XML_STRING).reserved_by
+    )
+
+
+def test_xml_fast_parser(benchmark):
+    """Parse with the single pass parser without memoization."""
+    assert (
+        "Person A"
+        == benchmark(_fast_parse_mouse_custom_class, XML_STRING).reserved_by
+    )
+
+
+def test_xml_memoized(benchmark):
+    """Parse a string that has been seen before."""
+    assert (
+        "Person A"
+        == benchmark(parse_mouse_custom_class, XML_STRING).reserved_by
+    )
+
+
+def test_subject_validation_pydantic_xml(benchmark, monkeypatch):
+    """Validate a subject row with three xml blobs using pydantic-xml."""
+    monkeypatch.setattr(
+        "aind_labtracks_service_server.models.parse_mouse_custom_class",
+        MouseCustomClass.from_xml,
+    )
+    subject = benchmark(Subject.model_validate, SUBJECT_ROW)
+    assert "Person C" == subject.maternal_class_values.reserved_by
+
+
+def test_subject_validation_memoized(benchmark):
+    """Validate a subject row with three xml blobs using the memo."""
+    subject = benchmark(Subject.model_validate, SUBJECT_ROW)
+    assert "Person C" == subject.maternal_class_values.reserved_by
@@ -0,0 +1,226 @@
+"""Module for caching rendered LabTracks views"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+from anyio import to_thread
+
+from aind_labtracks_service_server.models import CacheStats
+
+
+def create_redis_client(url: str) -> Any:
+    """
+    Create a Redis client. The redis package is an optional dependency, so it
+    is only imported when a Redis url is configured.
+    Parameters
+    ----------
+    url : str
+      Url of the Redis server, e.g. redis://localhost:6379/0
+
+    Returns
+    -------
+    redis.Redis
+
+    """
+    import redis
+
+    return redis.Redis.from_url(url)
+
+
+class ResponseCache:
+    """
+    Bounded in-memory cache. Entries expire after a time to live and the
+    least recently used entry is evicted once the cache is full. A ttl or
+    max_entries of 0 disables the cache. If a Redis client is given, it is
+    used as a shared second tier so that entries computed by one replica can
+    be served by the others.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        redis_client: Optional[Any] = None,
+        key_prefix: str = "",
+    ):
+        """
+        Class constructor
+        Parameters
+        ----------
+        ttl : float
+          Number of seconds an entry stays valid.
+        max_entries : int
+          Maximum number of entries to hold in memory.
+        redis_client : Optional[Any]
+          Client used for the shared tier. Values must be bytes when set.
+        key_prefix : str
+          Prefix added to keys stored in Redis.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _get_shared(self, key: Hashable) -> Tuple[Optional[bytes], float]:
+        """
+        Look up a key in Redis along with the seconds it has left to live, so
+        that a local copy does not outlive the shared entry. Errors are
+        logged and treated as misses.
+        """
+        try:
+            pipeline = self.redis_client.pipeline()
+            pipeline.get(f"{self.key_prefix}{key}")
+            pipeline.pttl(f"{self.key_prefix}{key}")
+            value, pttl = pipeline.execute()
+        except Exception as e:
+            logging.warning(f"Redis cache lookup failed: {e.args}")
+            return None, 0
+        # pttl is negative if the key has no expiry or is already gone
+        ttl = self.ttl if pttl < 0 else min(self.ttl, pttl / 1000)
+        return value, ttl
+
+    def _set_shared(self, key: Hashable, value: bytes) -> None:
+        """Store a value in Redis. Errors are logged and ignored."""
+        try:
+            self.redis_client.set(
+                f"{self.key_prefix}{key}", value, px=int(self.ttl * 1000)
+            )
+        except Exception as e:
+            logging.warning(f"Redis cache update failed: {e.args}")
+
+    def _set_local(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        """
+        Store a value in memory for ttl seconds, or the cache's ttl if None,
+        and evict entries beyond max_entries.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_local(self, key: Hashable) -> Optional[tuple]:
+        """Look up an unexpired entry in memory and count the hit."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        return None
+
+    def _load_shared(self, key: Hashable) -> Optional[bytes]:
+        """Look up a key in Redis and keep a local copy if it is found."""
+        value, ttl = self._get_shared(key)
+        if value is not None:
+            with self._lock:
+                self.shared_hits += 1
+            self._set_local(key, value, ttl)
+        return value
+
+    def _count_miss(self) -> None:
+        """Count a lookup that was not found in memory or Redis."""
+        with self._lock:
+            self.misses += 1
+
+    def get_or_set(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for a key. If it is missing or expired, the
+        value is pulled from Redis or computed with func and stored.
+        Parameters
+        ----------
+        key : Hashable
+        func : Callable[[], Any]
+          Called without arguments to compute the value on a miss.
+
+        Returns
+        -------
+        Any
+
+        """
+        if not self.enabled:
+            return func()
+        entry = self._get_local(key)
+        if entry is not None:
+            return entry[1]
+        if self.redis_client is not None:
+            value = self._load_shared(key)
+            if value is not None:
+                return value
+        self._count_miss()
+        value = func()
+        self._set_local(key, value)
+        if self.redis_client is not None:
+            self._set_shared(key, value)
+        return value
+
+    async def get_or_set_async(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Async variant of get_or_set, for values computed by a coroutine. The
+        Redis client is sync, so its calls are run in a worker thread.
+        Parameters
+        ----------
+        key : Hashable
+        func : Callable[[], Awaitable[Any]]
+          Called without arguments and awaited to compute the value on a
+          miss.
+
+        Returns
+        -------
+        Any
+
+        """
+        if not self.enabled:
+            return await func()
+        entry = self._get_local(key)
+        if entry is not None:
+            return entry[1]
+        if self.redis_client is not None:
+            value = await to_thread.run_sync(self._load_shared, key)
+            if value is not None:
+                return value
+        self._count_miss()
+        value = await func()
+        self._set_local(key, value)
+        if self.redis_client is not None:
+            await to_thread.run_sync(self._set_shared, key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all in-memory entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.shared_hits = 0
+            self.misses = 0
+
+    def stats(self) -> CacheStats:
+        """Return the current counters of the cache."""
+        with self._lock:
+            return CacheStats(
+                hits=self.hits,
+                shared_hits=self.shared_hits,
+                misses=self.misses,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+                ttl=self.ttl,
+            )
@@ -1,5 +1,6 @@
 """Module for settings to connect to LabTracks backend"""
 
+from typing import Optional
 from urllib.parse import quote_plus
 
 from aind_settings_utils.aws import SecretsManagerBaseSettings
@@ -7,6 +8,32 @@ from pydantic import Field, SecretStr
 from pydantic_settings import SettingsConfigDict
 
 
+def _cache_control(max_age: int, stale_while_revalidate: int) -> str:
+    """
+    Render a Cache-Control header value.
+    Parameters
+    ----------
+    max_age : int
+      Seconds a response may be reused. If not positive, caches must
+      revalidate the response before reusing it.
+    stale_while_revalidate : int
+      Seconds after max_age a stale response may still be served while it
+      is revalidated. Ignored if not positive.
+
+    Returns
+    -------
+    str
+
+    """
+    if max_age <= 0:
+        return "no-cache"
+    if stale_while_revalidate <= 0:
+        return f"max-age={max_age}"
+    return (
+        f"max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+    )
+
+
 class Settings(SecretsManagerBaseSettings):
     """Settings needed to connect to LabTracks Database"""
 
@@ -31,6 +58,221 @@ class Settings(SecretsManagerBaseSettings):
     )
     user: str = Field(..., title="User", description="Username.")
     password: SecretStr = Field(..., title="Password", description="Password.")
+    pool_size: int = Field(
+        default=5,
+        title="Pool Size",
+        description="Number of connections to keep open in the pool.",
+    )
+    max_overflow: int = Field(
+        default=10,
+        title="Max Overflow",
+        description=(
+            "Number of connections that can be opened beyond the pool size "
+            "during bursts of traffic."
+        ),
+    )
+    pool_timeout: float = Field(
+        default=30,
+        title="Pool Timeout",
+        description=(
+            "Seconds to wait for a connection from the pool before giving up."
+        ),
+    )
+    pool_recycle: int = Field(
+        default=-1,
+        title="Pool Recycle",
+        description=(
+            "Seconds after which a connection is replaced. -1 means "
+            "connections are never recycled."
+        ),
+    )
+    pool_pre_ping: bool = Field(
+        default=False,
+        title="Pool Pre Ping",
+        description=(
+            "Test connections for liveness when they are checked out of the "
+            "pool."
+        ),
+    )
+    pool_prewarm_connections: int = Field(
+        default=0,
+        ge=0,
+        title="Pool Prewarm Connections",
+        description=(
+            "Number of connections to open when the app starts, up to the "
+            "pool size, so that the first requests do not wait for a login."
+        ),
+    )
+    subject_cache_ttl: float = Field(
+        default=300,
+        title="Subject Cache TTL",
+        description=(
+            "Seconds a subject view is cached in memory. 0 disables the cache."
+        ),
+    )
+    subject_cache_max_entries: int = Field(
+        default=1024,
+        title="Subject Cache Max Entries",
+        description="Maximum number of subject views cached in memory.",
+    )
+    task_cache_ttl: float = Field(
+        default=300,
+        title="Task Cache TTL",
+        description=(
+            "Seconds a task view is cached in memory. 0 disables the cache."
+        ),
+    )
+    task_cache_max_entries: int = Field(
+        default=1024,
+        title="Task Cache Max Entries",
+        description="Maximum number of task views cached in memory.",
+    )
+    subject_cache_control_max_age: int = Field(
+        default=60,
+        title="Subject Cache-Control Max Age",
+        description=(
+            "Seconds proxies and clients may reuse a subject response. 0 "
+            "makes them revalidate it with its ETag on every request."
+        ),
+    )
+    subject_cache_control_stale_while_revalidate: int = Field(
+        default=0,
+        title="Subject Cache-Control Stale While Revalidate",
+        description=(
+            "Seconds after max age during which a stale subject response may "
+            "be served while it is revalidated in the background."
+        ),
+    )
+    task_cache_control_max_age: int = Field(
+        default=60,
+        title="Task Cache-Control Max Age",
+        description=(
+            "Seconds proxies and clients may reuse a task response. 0 makes "
+            "them revalidate it with its ETag on every request."
+        ),
+    )
+    task_cache_control_stale_while_revalidate: int = Field(
+        default=0,
+        title="Task Cache-Control Stale While Revalidate",
+        description=(
+            "Seconds after max age during which a stale task response may be "
+            "served while it is revalidated in the background."
+        ),
+    )
+    gzip_minimum_size: int = Field(
+        default=1000,
+        title="Gzip Minimum Size",
+        description=(
+            "Responses of at least this many bytes are gzip compressed for "
+            "clients that accept it."
+        ),
+    )
+    gzip_compress_level: int = Field(
+        default=6,
+        ge=1,
+        le=9,
+        title="Gzip Compress Level",
+        description=(
+            "Gzip compression level from 1 (fastest) to 9 (smallest)."
+        ),
+    )
+    async_queries: bool = Field(
+        default=False,
+        title="Async Queries",
+        description=(
+            "Run the subject and task view queries on an async aioodbc "
+            "engine, so that requests waiting on LabTracks do not hold a "
+            "worker thread. Requires the async extra."
+        ),
+    )
+    redis_url: Optional[str] = Field(
+        default=None,
+        title="Redis URL",
+        description=(
+            "Url of a Redis server used as a cache shared across replicas, "
+            "e.g. redis://localhost:6379/0. Requires the redis extra."
+        ),
+    )
+    redis_key_prefix: str = Field(
+        default="aind-labtracks-service",
+        title="Redis Key Prefix",
+        description="Prefix for keys stored in Redis.",
+    )
+    materialize_views: bool = Field(
+        default=False,
+        title="Materialize Views",
+        description=(
+            "Keep an in-memory copy of the subject and task views that is "
+            "refreshed in the background, and serve reads from it."
+        ),
+    )
+    materialize_refresh_interval: float = Field(
+        default=60,
+        title="Materialize Refresh Interval",
+        description=(
+            "Number of seconds between incremental refreshes of the "
+            "materialized views."
+        ),
+    )
+    materialize_full_refresh_interval: float = Field(
+        default=3600,
+        gt=0,
+        title="Materialize Full Refresh Interval",
+        description=(
+            "Number of seconds between refreshes that reload every subject, "
+            "so that deleted rows are dropped from the materialized views."
+        ),
+    )
+    materialize_max_staleness: float = Field(
+        default=300,
+        title="Materialize Max Staleness",
+        description=(
+            "Number of seconds since the last successful refresh after which "
+            "reads fall back to LabTracks."
+        ),
+    )
+    row_modified_overlap: float = Field(
+        default=60,
+        ge=0,
+        title="Row Modified Overlap",
+        description=(
+            "Number of seconds before a watermark to look for changes again. "
+            "Row_Modified is stamped before a transaction commits, so rows "
+            "committed late would otherwise be missed."
+        ),
+    )
+    slow_query_threshold: float = Field(
+        default=1.0,
+        title="Slow Query Threshold",
+        description=(
+            "Queries that take longer than this many seconds are logged with "
+            "their statement."
+        ),
+    )
+    profiling_enabled: bool = Field(
+        default=False,
+        title="Profiling Enabled",
+        description=(
+            "Profile requests that send an X-Debug-Profile header and log "
+            "the results."
+        ),
+    )
+
+    @property
+    def subject_cache_control(self) -> str:
+        """Cache-Control header value for subject responses"""
+        return _cache_control(
+            self.subject_cache_control_max_age,
+            self.subject_cache_control_stale_while_revalidate,
+        )
+
+    @property
+    def task_cache_control(self) -> str:
+        """Cache-Control header value for task responses"""
+        return _cache_control(
+            self.task_cache_control_max_age,
+            self.task_cache_control_stale_while_revalidate,
+        )
 
     @property
     def db_connection_str(self):
@@ -40,3 +282,10 @@ class Settings(SecretsManagerBaseSettings):
             f"mssql+pyodbc://{self.user}:{encoded_password}@"
             f"{self.host}:{self.port}/{self.database}?driver={self.driver}"
         )
+
+    @property
+    def async_db_connection_str(self):
+        """Compute the connection string for the async aioodbc driver"""
+        return self.db_connection_str.replace(
+            "mssql+pyodbc://", "mssql+aioodbc://", 1
+        )
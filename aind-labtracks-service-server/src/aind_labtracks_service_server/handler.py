@@ -1,21 +1,454 @@
 """Module to retrieve data from LabTracks using session object"""
 
-from typing import List, Union
+import logging
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from sqlalchemy import Row, bindparam, func, union
 from sqlalchemy.orm import aliased
+from sqlalchemy.sql import CompoundSelect, Select
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from aind_labtracks_service_server.metrics import QUERY_DURATION, QUERY_ROWS
 from aind_labtracks_service_server.models import (
     AcucProtocol,
     AnimalsCommon,
+    ChangeFeed,
     Groups,
     Species,
     Subject,
     Task,
+    TaskFilters,
     TaskSet,
     TaskSetObject,
     TaskType,
 )
+from aind_labtracks_service_server.session import get_settings
+
+# Number of rows fetched from the cursor at a time when streaming tasks
+STREAM_BATCH_SIZE = 500
+
+# SQL Server rejects statements with more than 2100 parameters, so IN-lists
+# are split into chunks comfortably below that limit.
+MAX_IN_CLAUSE_SIZE = 2000
+
+
+def _chunk_ids(ids: List[int], chunk_size: int) -> Iterator[List[int]]:
+    """Split a list of ids into consecutive chunks of at most chunk_size."""
+    for start in range(0, len(ids), chunk_size):
+        end = start + chunk_size
+        yield ids[start:end]
+
+
+def _unique_ids(subject_ids: Iterable[Union[str, int]]) -> List[int]:
+    """Convert ids to ints and drop duplicates while preserving order."""
+    return list(dict.fromkeys(int(subject_id) for subject_id in subject_ids))
+
+
+def _subject_view_statement(
+    id_clause: Callable[[Any], Any], fields: Optional[Tuple[str, ...]] = None
+) -> Select:
+    """
+    Build the subject view statement. If only some fields are requested, the
+    outer joins that are not needed for them are left out.
+    Parameters
+    ----------
+    id_clause : Callable[[Any], Any]
+      Function that takes the aliased AnimalsCommon table and returns the
+      where clause used to select subjects.
+    fields : Optional[Tuple[str, ...]]
+      Subject fields to select. The id is always selected. If None, all
+      fields are selected.
+
+    Returns
+    -------
+    Select
+
+    """
+    ac = aliased(AnimalsCommon, name="ac")
+    p = aliased(AnimalsCommon, name="p")
+    m = aliased(AnimalsCommon, name="m")
+    g = aliased(Groups, name="g")
+    gm = aliased(Groups, name="gm")
+    s = aliased(Species, name="s")
+    # Each field maps to its column and the aliases it needs to be joined
+    # PyCharm raises warnings about the usage of the .label method
+    # noinspection PyUnresolvedReferences
+    columns = {
+        "id": (ac.id, ()),
+        "class_values": (ac.class_values, ()),
+        "sex": (ac.sex, ()),
+        "birth_date": (ac.birth_date, ()),
+        "species_name": (s.species_name, ("s",)),
+        "cage_id": (ac.cage_id, ()),
+        "room_id": (ac.room_id, ()),
+        "paternal_id": (ac.paternal_index.label("paternal_id"), ()),
+        "paternal_class_values": (
+            p.class_values.label("paternal_class_values"),
+            ("p",),
+        ),
+        "maternal_id": (ac.maternal_index.label("maternal_id"), ()),
+        "maternal_class_values": (
+            m.class_values.label("maternal_class_values"),
+            ("m",),
+        ),
+        "group_name": (g.group_name, ("g",)),
+        "group_description": (
+            gm.group_description.label("group_description"),
+            ("m", "gm"),
+        ),
+    }
+    # Ordered so that m is joined before gm
+    joins = {
+        "s": (s, ac.species_id == s.id),
+        "p": (p, ac.paternal_index == p.id),
+        "m": (m, ac.maternal_index == m.id),
+        "g": (g, ac.group_id == g.id),
+        "gm": (gm, m.group_id == gm.id),
+    }
+    names = [
+        name
+        for name in columns
+        if fields is None or name == "id" or name in fields
+    ]
+    needed_joins = {alias for name in names for alias in columns[name][1]}
+    statement = select(*[columns[name][0] for name in names]).where(
+        id_clause(ac)
+    )
+    for alias, (target, on_clause) in joins.items():
+        if alias in needed_joins:
+            statement = statement.outerjoin(target, on_clause)
+    return statement
+
+
+def _task_view_statement(id_clause: Callable[[Any], Any]) -> Select:
+    """
+    Build the task view statement.
+    Parameters
+    ----------
+    id_clause : Callable[[Any], Any]
+      Function that takes the aliased AnimalsCommon table and returns the
+      where clause used to select the subjects the tasks belong to.
+
+    Returns
+    -------
+    Select
+
+    """
+    ts = aliased(TaskSet, name="ts")
+    tso = aliased(TaskSetObject, name="tso")
+    tt = aliased(TaskType, name="tt")
+    ap = aliased(AcucProtocol, name="ap")
+    ac = aliased(AnimalsCommon, name="ac")
+    statement = (
+        select(
+            ts.id,
+            tt.type_name,
+            ts.date_start,
+            ts.date_end,
+            ts.investigator_id,
+            ts.task_description,
+            tso.task_object,
+            ap.protocol_number,
+            ap.protocol_title,
+            ts.task_status,
+        )
+        .where(id_clause(ac))
+        .join(tso, ts.id == tso.task_id)
+        .join(ac, ac.id == tso.task_object)
+        .join(tt, ts.task_type_id == tt.id)
+        .join(ap, ts.acuc_link_id == ap.link_index)
+    )
+    return statement
+
+
+# The view statements are built once at import. Subject ids are passed in as
+# bound parameters at execution, so SQLAlchemy can reuse the compiled SQL
+# from its statement cache instead of rebuilding the join graph per request.
+SUBJECT_VIEW_STATEMENT = _subject_view_statement(
+    lambda ac: ac.id == bindparam("subject_id")
+)
+SUBJECT_VIEWS_STATEMENT = _subject_view_statement(
+    lambda ac: ac.id.in_(bindparam("subject_ids", expanding=True))
+)
+
+
+@lru_cache(maxsize=None)
+def _subject_view_fields_statement(fields: Tuple[str, ...]) -> Select:
+    """
+    Build the subject view statement for a subset of fields. One statement is
+    built per combination of fields.
+    Parameters
+    ----------
+    fields : Tuple[str, ...]
+      Subject fields to select.
+
+    Returns
+    -------
+    Select
+
+    """
+    return _subject_view_statement(
+        lambda ac: ac.id == bindparam("subject_id"), fields=fields
+    )
+
+
+TASK_VIEW_STATEMENT = _task_view_statement(
+    lambda ac: ac.id == bindparam("subject_id")
+)
+TASK_VIEWS_STATEMENT = _task_view_statement(
+    lambda ac: ac.id.in_(bindparam("subject_ids", expanding=True))
+)
+
+
+# Where clauses for each task filter, given the selected columns of the task
+# view. Filter values are bound at execution.
+TASK_FILTER_CLAUSES = {
+    "date_start_from": lambda c: c.date_start >= bindparam("date_start_from"),
+    "date_start_to": lambda c: c.date_start <= bindparam("date_start_to"),
+    "type_name": lambda c: c.type_name == bindparam("type_name"),
+    "task_status": lambda c: c.task_status == bindparam("task_status"),
+}
+
+
+@lru_cache(maxsize=None)
+def _task_view_variant_statement(
+    filter_names: Tuple[str, ...],
+    ordered: bool,
+    has_after: bool,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Select:
+    """
+    Build the task view statement with filters, keyset pagination and
+    column projection. Values are bound at execution, so one statement is
+    built per combination of parameters.
+    Parameters
+    ----------
+    filter_names : Tuple[str, ...]
+      Keys of TASK_FILTER_CLAUSES to apply.
+    ordered : bool
+      Whether to order tasks by task id, as needed for pagination.
+    has_after : bool
+      Whether to only return tasks with an id greater than a cursor.
+    fields : Optional[Tuple[str, ...]]
+      Task fields to select. The id is always selected. The inner joins are
+      kept even if none of their columns are selected, since they decide
+      which tasks are returned.
+
+    Returns
+    -------
+    Select
+
+    """
+    columns = TASK_VIEW_STATEMENT.selected_columns
+    statement = TASK_VIEW_STATEMENT
+    for filter_name in filter_names:
+        statement = statement.where(TASK_FILTER_CLAUSES[filter_name](columns))
+    if has_after:
+        statement = statement.where(columns.id > bindparam("after"))
+    if ordered:
+        statement = statement.order_by(columns.id)
+    if fields is not None:
+        statement = statement.with_only_columns(
+            *[c for c in columns if c.key == "id" or c.key in fields]
+        )
+    return statement
+
+
+def _modified_subject_ids_statement() -> CompoundSelect:
+    """
+    Build the statement for the ids of subjects whose view may have changed
+    after a timestamp, bound as since. A subject view changes if the animal,
+    one of its parents, its species, its group or its mother's group was
+    modified. Each branch is a range scan on a single row_modified column.
+
+    Returns
+    -------
+    CompoundSelect
+
+    """
+    ac = aliased(AnimalsCommon, name="ac")
+    p = aliased(AnimalsCommon, name="p")
+    m = aliased(AnimalsCommon, name="m")
+    g = aliased(Groups, name="g")
+    gm = aliased(Groups, name="gm")
+    s = aliased(Species, name="s")
+    since = bindparam("since")
+    return union(
+        select(ac.id).where(ac.row_modified > since),
+        select(ac.id)
+        .join(p, ac.paternal_index == p.id)
+        .where(p.row_modified > since),
+        select(ac.id)
+        .join(m, ac.maternal_index == m.id)
+        .where(m.row_modified > since),
+        select(ac.id)
+        .join(s, ac.species_id == s.id)
+        .where(s.row_modified > since),
+        select(ac.id)
+        .join(g, ac.group_id == g.id)
+        .where(g.row_modified > since),
+        select(ac.id)
+        .join(m, ac.maternal_index == m.id)
+        .join(gm, m.group_id == gm.id)
+        .where(gm.row_modified > since),
+    )
+
+
+def _modified_task_subject_ids_statement() -> CompoundSelect:
+    """
+    Build the statement for the ids of subjects whose task view may have
+    changed after a timestamp, bound as since.
+
+    Returns
+    -------
+    CompoundSelect
+
+    """
+    ts = aliased(TaskSet, name="ts")
+    tso = aliased(TaskSetObject, name="tso")
+    tt = aliased(TaskType, name="tt")
+    ap = aliased(AcucProtocol, name="ap")
+    since = bindparam("since")
+    return union(
+        select(tso.task_object).where(tso.row_modified > since),
+        select(tso.task_object)
+        .join(ts, ts.id == tso.task_id)
+        .where(ts.row_modified > since),
+        select(tso.task_object)
+        .join(ts, ts.id == tso.task_id)
+        .join(tt, ts.task_type_id == tt.id)
+        .where(tt.row_modified > since),
+        select(tso.task_object)
+        .join(ts, ts.id == tso.task_id)
+        .join(ap, ts.acuc_link_id == ap.link_index)
+        .where(ap.row_modified > since),
+    )
+
+
+MODIFIED_SUBJECT_IDS_STATEMENT = _modified_subject_ids_statement()
+MODIFIED_TASK_SUBJECT_IDS_STATEMENT = _modified_task_subject_ids_statement()
+ALL_SUBJECT_IDS_STATEMENT = select(AnimalsCommon.id)
+ALL_TASK_SUBJECT_IDS_STATEMENT = select(TaskSetObject.task_object).distinct()
+# Tables whose row_modified columns feed into the subject and task views
+ROW_MODIFIED_WATERMARK_STATEMENTS = [
+    select(func.max(table.row_modified))
+    for table in (
+        AnimalsCommon,
+        Species,
+        Groups,
+        TaskSet,
+        TaskSetObject,
+        TaskType,
+        AcucProtocol,
+    )
+]
+
+
+def _record_query(query: str, duration: float, rows: List[Row]) -> None:
+    """
+    Record the duration and row count of a view query, and log it with its
+    row count if it was slower than the threshold. Row counts are not known
+    to the cursor events, since the drivers report -1 for selects.
+    """
+    QUERY_DURATION.labels(query).observe(duration)
+    QUERY_ROWS.labels(query).observe(len(rows))
+    if duration > get_settings().slow_query_threshold:
+        logging.warning(
+            f"Slow {query} query took {duration:.3f}s and returned "
+            f"{len(rows)} rows"
+        )
+
+
+def _subject_view_query(
+    subject_id: Union[str, int], fields: Optional[Tuple[str, ...]] = None
+) -> Tuple[Select, Dict[str, Any]]:
+    """
+    Pick the subject view statement and parameters for a request.
+    Parameters
+    ----------
+    subject_id : Union[str, int]
+      ID of mouse to pull information about.
+    fields : Optional[Tuple[str, ...]]
+      Subject fields to select.
+
+    Returns
+    -------
+    Tuple[Select, Dict[str, Any]]
+
+    """
+    statement = (
+        SUBJECT_VIEW_STATEMENT
+        if fields is None
+        else _subject_view_fields_statement(tuple(fields))
+    )
+    return statement, {"subject_id": int(subject_id)}
+
+
+def _task_view_query(
+    subject_id: Union[str, int],
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    filters: Optional[TaskFilters] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Tuple[Select, Dict[str, Any]]:
+    """
+    Pick the task view statement and parameters for a request.
+    Parameters
+    ----------
+    subject_id : Union[str, int]
+      ID of mouse to pull information about.
+    limit : Optional[int]
+      Maximum number of tasks to return.
+    after : Optional[int]
+      Only return tasks with an id greater than this cursor.
+    filters : Optional[TaskFilters]
+      Filters applied in the database.
+    fields : Optional[Tuple[str, ...]]
+      Task fields to select.
+
+    Returns
+    -------
+    Tuple[Select, Dict[str, Any]]
+
+    """
+    params = {"subject_id": int(subject_id)}
+    filter_values = (
+        {} if filters is None else filters.model_dump(exclude_none=True)
+    )
+    if (
+        limit is None
+        and after is None
+        and not filter_values
+        and fields is None
+    ):
+        return TASK_VIEW_STATEMENT, params
+    statement = _task_view_variant_statement(
+        filter_names=tuple(sorted(filter_values)),
+        ordered=limit is not None or after is not None,
+        has_after=after is not None,
+        fields=None if fields is None else tuple(fields),
+    )
+    params.update(filter_values)
+    if after is not None:
+        params["after"] = after
+    if limit is not None:
+        # A plain int limit lets SQL Server use TOP for the page size
+        statement = statement.limit(limit)
+    return statement, params
 
 
 class SessionHandler:
@@ -25,13 +458,48 @@ class SessionHandler:
         """Class constructor"""
         self.session = session
 
-    def get_subject_view(self, subject_id: Union[str, int]) -> List[Subject]:
+    def _fetch_rows(
+        self, query: str, statement: Select, params: Dict[str, Any]
+    ) -> List[Row]:
+        """
+        Run a view query and fetch all of its rows. The duration and row
+        count are recorded with _record_query.
+        Parameters
+        ----------
+        query : str
+          Name of the query for the metrics, e.g. subject_view.
+        statement : Select
+        params : Dict[str, Any]
+
+        Returns
+        -------
+        List[Row]
+
+        """
+        start = time.perf_counter()
+        rows = self.session.execute(
+            statement=statement,
+            params=params,
+            execution_options={"query": query},
+        ).all()
+        _record_query(query, time.perf_counter() - start, rows)
+        return rows
+
+    def get_subject_view(
+        self,
+        subject_id: Union[str, int],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Subject]:
         """
         Get a subject view from LabTracks by joining several tables.
         Parameters
         ----------
         subject_id : Union[str, int]
           ID of mouse to pull information about.
+        fields : Optional[Tuple[str, ...]]
+          Subject fields to select. Tables that are only needed for other
+          fields are not joined and fields that are not selected are left as
+          None. If None, all fields are selected.
 
         Returns
         -------
@@ -40,43 +508,19 @@ class SessionHandler:
           is likely due to an error with data entry into LabTracks.
 
         """
-        subject_id = int(subject_id)
-        ac = aliased(AnimalsCommon, name="ac")
-        p = aliased(AnimalsCommon, name="p")
-        m = aliased(AnimalsCommon, name="m")
-        g = aliased(Groups, name="g")
-        gm = aliased(Groups, name="gm")
-        s = aliased(Species, name="s")
-        # PyCharm raises warnings about the usage of the .label method
-        # noinspection PyUnresolvedReferences
-        statement = (
-            select(
-                ac.id,
-                ac.class_values,
-                ac.sex,
-                ac.birth_date,
-                s.species_name,
-                ac.cage_id,
-                ac.room_id,
-                ac.paternal_index.label("paternal_id"),
-                p.class_values.label("paternal_class_values"),
-                ac.maternal_index.label("maternal_id"),
-                m.class_values.label("maternal_class_values"),
-                g.group_name,
-                gm.group_description.label("group_description"),
-            )
-            .where(ac.id == subject_id)
-            .outerjoin(s, ac.species_id == s.id)
-            .outerjoin(p, ac.paternal_index == p.id)
-            .outerjoin(m, ac.maternal_index == m.id)
-            .outerjoin(g, ac.group_id == g.id)
-            .outerjoin(gm, m.group_id == gm.id)
-        )
-        results = self.session.execute(statement=statement)
-        subject_models = [Subject.model_validate(r) for r in results]
+        statement, params = _subject_view_query(subject_id, fields)
+        rows = self._fetch_rows("subject_view", statement, params)
+        subject_models = [Subject.model_validate(r) for r in rows]
         return subject_models
 
-    def get_task_view(self, subject_id: Union[str, int]) -> List[Task]:
+    def get_task_view(
+        self,
+        subject_id: Union[str, int],
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        filters: Optional[TaskFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Task]:
         """
         Get a task view from LabTracks by joining several tables.
         Tasks include cage prep, non-surgical procedures, breeding, etc.
@@ -84,6 +528,18 @@ class SessionHandler:
         ----------
         subject_id : Union[str, int]
           ID of mouse to pull information about.
+        limit : Optional[int]
+          Maximum number of tasks to return. If limit or after is set, tasks
+          are ordered by id.
+        after : Optional[int]
+          Only return tasks with an id greater than this cursor. Use the id of
+          the last task of the previous page.
+        filters : Optional[TaskFilters]
+          Filters on date_start, type_name and task_status applied in the
+          database.
+        fields : Optional[Tuple[str, ...]]
+          Task fields to select. Fields that are not selected are left as
+          None. If None, all fields are selected.
 
         Returns
         -------
@@ -91,31 +547,334 @@ class SessionHandler:
           List of Task models. More than one row can be returned.
 
         """
-        subject_id = int(subject_id)
-        ts = aliased(TaskSet, name="ts")
-        tso = aliased(TaskSetObject, name="tso")
-        tt = aliased(TaskType, name="tt")
-        ap = aliased(AcucProtocol, name="ap")
-        ac = aliased(AnimalsCommon, name="ac")
-        statement = (
-            select(
-                ts.id,
-                tt.type_name,
-                ts.date_start,
-                ts.date_end,
-                ts.investigator_id,
-                ts.task_description,
-                tso.task_object,
-                ap.protocol_number,
-                ap.protocol_title,
-                ts.task_status,
+        statement, params = _task_view_query(
+            subject_id, limit, after, filters, fields
+        )
+        rows = self._fetch_rows("task_view", statement, params)
+        task_models = [Task.model_validate(r) for r in rows]
+        return task_models
+
+    def iter_task_view(
+        self,
+        subject_id: Union[str, int],
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        filters: Optional[TaskFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> Iterator[Task]:
+        """
+        Stream a task view from LabTracks. Rows are fetched from the cursor in
+        batches and validated one at a time, so the full task list is never
+        held in memory.
+        Parameters
+        ----------
+        subject_id : Union[str, int]
+          ID of mouse to pull information about.
+        limit : Optional[int]
+          Maximum number of tasks to return.
+        after : Optional[int]
+          Only return tasks with an id greater than this cursor.
+        filters : Optional[TaskFilters]
+          Filters applied in the database.
+        fields : Optional[Tuple[str, ...]]
+          Task fields to select.
+        batch_size : int
+          Number of rows fetched from the cursor at a time.
+
+        Returns
+        -------
+        Iterator[Task]
+
+        """
+        statement, params = _task_view_query(
+            subject_id, limit, after, filters, fields
+        )
+        results = self.session.execute(
+            statement=statement,
+            params=params,
+            execution_options={"yield_per": batch_size, "query": "task_view"},
+        )
+        try:
+            for r in results:
+                yield Task.model_validate(r)
+        finally:
+            results.close()
+
+    def get_subject_views(
+        self, subject_ids: Iterable[Union[str, int]]
+    ) -> Dict[int, List[Subject]]:
+        """
+        Get subject views for several subjects at once. The ids are queried
+        in chunks with an IN clause rather than one query per subject.
+        Parameters
+        ----------
+        subject_ids : Iterable[Union[str, int]]
+          IDs of mice to pull information about.
+
+        Returns
+        -------
+        Dict[int, List[Subject]]
+          Subject models grouped by subject id. Every requested id is a key.
+          If nothing is found for an id, it will map to an empty list.
+
+        """
+        ids = _unique_ids(subject_ids)
+        subject_models = {subject_id: [] for subject_id in ids}
+        for chunk in _chunk_ids(ids, MAX_IN_CLAUSE_SIZE):
+            rows = self._fetch_rows(
+                "subject_views",
+                SUBJECT_VIEWS_STATEMENT,
+                {"subject_ids": chunk},
             )
-            .where(ac.id == subject_id)
-            .join(tso, ts.id == tso.task_id)
-            .join(ac, ac.id == tso.task_object)
-            .join(tt, ts.task_type_id == tt.id)
-            .join(ap, ts.acuc_link_id == ap.link_index)
+            for r in rows:
+                subject = Subject.model_validate(r)
+                subject_models[int(subject.id)].append(subject)
+        return subject_models
+
+    def get_task_views(
+        self, subject_ids: Iterable[Union[str, int]]
+    ) -> Dict[int, List[Task]]:
+        """
+        Get task views for several subjects at once. The ids are queried in
+        chunks with an IN clause rather than one query per subject.
+        Parameters
+        ----------
+        subject_ids : Iterable[Union[str, int]]
+          IDs of mice to pull information about.
+
+        Returns
+        -------
+        Dict[int, List[Task]]
+          Task models grouped by subject id. Every requested id is a key. If
+          no tasks are found for an id, it will map to an empty list.
+
+        """
+        ids = _unique_ids(subject_ids)
+        task_models = {subject_id: [] for subject_id in ids}
+        for chunk in _chunk_ids(ids, MAX_IN_CLAUSE_SIZE):
+            rows = self._fetch_rows(
+                "task_views", TASK_VIEWS_STATEMENT, {"subject_ids": chunk}
+            )
+            for r in rows:
+                task = Task.model_validate(r)
+                task_models[int(task.task_object)].append(task)
+        return task_models
+
+    def get_modified_subject_ids(
+        self, since: Optional[datetime] = None
+    ) -> List[int]:
+        """
+        Get the ids of subjects whose subject view may have changed.
+        Parameters
+        ----------
+        since : Optional[datetime]
+          Only return subjects modified after this time. If None, the ids of
+          all subjects are returned.
+
+        Returns
+        -------
+        List[int]
+
+        """
+        if since is None:
+            results = self.session.execute(
+                ALL_SUBJECT_IDS_STATEMENT,
+                execution_options={"query": "subject_ids"},
+            )
+        else:
+            results = self.session.execute(
+                MODIFIED_SUBJECT_IDS_STATEMENT,
+                params={"since": since},
+                execution_options={"query": "modified_subject_ids"},
+            )
+        return sorted({int(r[0]) for r in results})
+
+    def get_modified_task_subject_ids(
+        self, since: Optional[datetime] = None
+    ) -> List[int]:
+        """
+        Get the ids of subjects whose task view may have changed.
+        Parameters
+        ----------
+        since : Optional[datetime]
+          Only return subjects with tasks modified after this time. If None,
+          the ids of all subjects with tasks are returned.
+
+        Returns
+        -------
+        List[int]
+
+        """
+        if since is None:
+            results = self.session.execute(
+                ALL_TASK_SUBJECT_IDS_STATEMENT,
+                execution_options={"query": "task_subject_ids"},
+            )
+        else:
+            results = self.session.execute(
+                MODIFIED_TASK_SUBJECT_IDS_STATEMENT,
+                params={"since": since},
+                execution_options={"query": "modified_task_subject_ids"},
+            )
+        return sorted({int(r[0]) for r in results if r[0] is not None})
+
+    def get_row_modified_watermark(self) -> Optional[datetime]:
+        """
+        Get the latest row_modified timestamp of the tables that make up the
+        subject and task views.
+
+        Returns
+        -------
+        Optional[datetime]
+          None if none of the tables have a row_modified timestamp.
+
+        """
+        timestamps = [
+            self.session.execute(
+                statement, execution_options={"query": "row_modified"}
+            ).scalar()
+            for statement in ROW_MODIFIED_WATERMARK_STATEMENTS
+        ]
+        timestamps = [t for t in timestamps if t is not None]
+        return max(timestamps, default=None)
+
+    def get_changes(
+        self,
+        since: datetime,
+        include_views: bool = False,
+        overlap: timedelta = timedelta(0),
+    ) -> ChangeFeed:
+        """
+        Get the subjects and tasks modified after a timestamp.
+        Parameters
+        ----------
+        since : datetime
+          Only return changes after this time, less the overlap.
+        include_views : bool
+          Whether to also return the subject and task views of the changed
+          subjects.
+        overlap : timedelta
+          How far before since to look for changes. Row_Modified is stamped
+          when a statement runs rather than when its transaction commits, so
+          a row can become visible after a watermark later than its
+          timestamp was read. Changes within the overlap are returned again.
+
+        Returns
+        -------
+        ChangeFeed
+
+        """
+        # The watermark is read first, so it is never later than the changes
+        # returned. Rows committed late are only caught by the overlap, so
+        # callers must expect the same subject in consecutive feeds.
+        watermark = self.get_row_modified_watermark()
+        subject_ids = self.get_modified_subject_ids(since=since - overlap)
+        task_subject_ids = self.get_modified_task_subject_ids(
+            since=since - overlap
+        )
+        changes = ChangeFeed(
+            since=since,
+            watermark=watermark,
+            subject_ids=subject_ids,
+            task_subject_ids=task_subject_ids,
+        )
+        if include_views:
+            changes.subjects = self.get_subject_views(subject_ids)
+            changes.tasks = self.get_task_views(task_subject_ids)
+        return changes
+
+
+class AsyncSessionHandler:
+    """
+    Handle async session object to get the subject and task views without
+    holding a thread while LabTracks runs the query.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """Class constructor"""
+        self.session = session
+
+    async def _fetch_rows(
+        self, query: str, statement: Select, params: Dict[str, Any]
+    ) -> List[Row]:
+        """
+        Async variant of SessionHandler._fetch_rows.
+        Parameters
+        ----------
+        query : str
+          Name of the query for the metrics, e.g. subject_view.
+        statement : Select
+        params : Dict[str, Any]
+
+        Returns
+        -------
+        List[Row]
+
+        """
+        start = time.perf_counter()
+        result = await self.session.exec(
+            statement, params=params, execution_options={"query": query}
+        )
+        rows = result.all()
+        _record_query(query, time.perf_counter() - start, rows)
+        return rows
+
+    async def get_subject_view(
+        self,
+        subject_id: Union[str, int],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Subject]:
+        """
+        Async variant of SessionHandler.get_subject_view.
+        Parameters
+        ----------
+        subject_id : Union[str, int]
+          ID of mouse to pull information about.
+        fields : Optional[Tuple[str, ...]]
+          Subject fields to select. If None, all fields are selected.
+
+        Returns
+        -------
+        List[Subject]
+
+        """
+        statement, params = _subject_view_query(subject_id, fields)
+        rows = await self._fetch_rows("subject_view", statement, params)
+        subject_models = [Subject.model_validate(r) for r in rows]
+        return subject_models
+
+    async def get_task_view(
+        self,
+        subject_id: Union[str, int],
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        filters: Optional[TaskFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Task]:
+        """
+        Async variant of SessionHandler.get_task_view.
+        Parameters
+        ----------
+        subject_id : Union[str, int]
+          ID of mouse to pull information about.
+        limit : Optional[int]
+          Maximum number of tasks to return.
+        after : Optional[int]
+          Only return tasks with an id greater than this cursor.
+        filters : Optional[TaskFilters]
+          Filters applied in the database.
+        fields : Optional[Tuple[str, ...]]
+          Task fields to select. If None, all fields are selected.
+
+        Returns
+        -------
+        List[Task]
+
+        """
+        statement, params = _task_view_query(
+            subject_id, limit, after, filters, fields
         )
-        results = self.session.execute(statement=statement)
-        task_models = [Task.model_validate(r) for r in results]
+        rows = await self._fetch_rows("task_view", statement, params)
+        task_models = [Task.model_validate(r) for r in rows]
         return task_models
@@ -2,13 +2,30 @@
 
 import logging
 import os
+from contextlib import asynccontextmanager
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.routing import APIRoute
+from starlette.types import ASGIApp
 
 from aind_labtracks_service_server import __version__ as service_version
-from aind_labtracks_service_server.route import router
+from aind_labtracks_service_server.metrics import RequestDurationMiddleware
+from aind_labtracks_service_server.profiling import ProfilingMiddleware
+from aind_labtracks_service_server.route import (
+    get_caches,
+    get_materialized_views,
+    router,
+)
+from aind_labtracks_service_server.session import (
+    get_async_engine,
+    get_engine,
+    get_session_local,
+    get_settings,
+    prewarm_engine,
+)
 
 log_level = os.getenv("LOG_LEVEL", "INFO")
 logging.basicConfig(level=log_level)
@@ -20,21 +37,74 @@ Service to fetch data from LabTracks.
 
 """
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """
+    Load the settings and create the engines and response caches on
+    startup. Creating them here means a bad configuration, such as a Redis
+    url without the redis extra, fails at startup rather than on every
+    request. If enabled, open pooled connections up front and start
+    refreshing the materialized views. Stop the refresh and dispose of the
+    engines on shutdown.
+    """
+    settings = get_settings()
+    engine = get_engine()
+    async_engine = get_async_engine() if settings.async_queries else None
+    get_caches()
+    if settings.pool_prewarm_connections > 0:
+        await to_thread.run_sync(
+            prewarm_engine,
+            engine,
+            min(settings.pool_prewarm_connections, settings.pool_size),
+        )
+    if settings.materialize_views:
+        get_materialized_views().start(
+            get_session_local(), settings.materialize_refresh_interval
+        )
+    yield
+    get_materialized_views().stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+
+def gzip_middleware(app: ASGIApp) -> GZipMiddleware:
+    """
+    Compress responses as configured in the settings. Starlette creates the
+    middleware when the app first starts, so the settings are not loaded on
+    import.
+    """
+    settings = get_settings()
+    return GZipMiddleware(
+        app,
+        minimum_size=settings.gzip_minimum_size,
+        compresslevel=settings.gzip_compress_level,
+    )
+
+
 # noinspection PyTypeChecker
 app = FastAPI(
     title="aind-labtracks-service",
     description=description,
     summary="Serves data from LabTracks.",
     version=service_version,
+    lifespan=lifespan,
 )
 
 # noinspection PyTypeChecker
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    expose_headers=["Link", "X-Next-Cursor"],
 )
+# Bodies served from the response caches are already compressed by the
+# routes and are passed through unchanged.
+app.add_middleware(gzip_middleware)
+app.add_middleware(RequestDurationMiddleware)
+app.add_middleware(ProfilingMiddleware)
 app.include_router(router)
 
 # Clean up the methods names that is generated in the client code
@@ -0,0 +1,182 @@
+"""Module for keeping a local copy of the LabTracks subject and task views"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlmodel import Session
+
+from aind_labtracks_service_server.handler import SessionHandler
+from aind_labtracks_service_server.models import Subject, Task
+
+
+class MaterializedViews:
+    """
+    In-memory copy of the subject and task views. The first refresh loads
+    every subject. Later refreshes only reload subjects whose rows were
+    modified since the last refresh, based on the row_modified timestamps of
+    the tables that make up the views. Deleted rows leave no timestamp
+    behind, so the whole copy is rebuilt every full_refresh_interval. Reads
+    are only served while the copy is fresher than max_staleness.
+    """
+
+    def __init__(
+        self,
+        max_staleness: float,
+        full_refresh_interval: float = 3600,
+        overlap: float = 0,
+    ):
+        """
+        Class constructor
+        Parameters
+        ----------
+        max_staleness : float
+          Number of seconds since the last successful refresh after which
+          the copy is no longer served.
+        full_refresh_interval : float
+          Number of seconds after which a refresh reloads every subject
+          rather than only the modified ones.
+        overlap : float
+          Number of seconds before the last watermark to look for changes,
+          to catch rows committed after their row_modified timestamp.
+        """
+        self.max_staleness = max_staleness
+        self.full_refresh_interval = full_refresh_interval
+        self.overlap = timedelta(seconds=overlap)
+        self.watermark: Optional[datetime] = None
+        self.refreshed_at: Optional[float] = None
+        self.full_refreshed_at: Optional[float] = None
+        self._subjects: Dict[int, List[Subject]] = {}
+        self._tasks: Dict[int, List[Task]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the copy was refreshed within max_staleness."""
+        return (
+            self.refreshed_at is not None
+            and time.monotonic() - self.refreshed_at <= self.max_staleness
+        )
+
+    def refresh(self, session: Session) -> None:
+        """
+        Load the subjects and tasks modified since the last refresh, or all
+        of them if the last full refresh is older than full_refresh_interval.
+        Parameters
+        ----------
+        session : Session
+          LabTracks session to query.
+        """
+        now = time.monotonic()
+        full = (
+            self.watermark is None
+            or self.full_refreshed_at is None
+            or now - self.full_refreshed_at >= self.full_refresh_interval
+        )
+        since = None if full else self.watermark - self.overlap
+        handler = SessionHandler(session=session)
+        # Read the new watermark first, so that it is never later than the
+        # rows loaded. Rows committed late are caught by the overlap.
+        watermark = handler.get_row_modified_watermark()
+        subject_ids = handler.get_modified_subject_ids(since=since)
+        task_subject_ids = handler.get_modified_task_subject_ids(since=since)
+        subjects = handler.get_subject_views(subject_ids)
+        tasks = handler.get_task_views(task_subject_ids)
+        with self._lock:
+            if full:
+                self._subjects = {}
+                self._tasks = {}
+                self.full_refreshed_at = now
+            for subject_id, subject_models in subjects.items():
+                if subject_models:
+                    self._subjects[subject_id] = subject_models
+                else:
+                    self._subjects.pop(subject_id, None)
+            self._tasks.update(tasks)
+            self.watermark = watermark
+            self.refreshed_at = now
+        logging.info(
+            f"Refreshed {'all ' if full else ''}{len(subject_ids)} subject "
+            f"views and {len(task_subject_ids)} task views"
+        )
+
+    def get_subject_view(self, subject_id: int) -> Optional[List[Subject]]:
+        """
+        Get a subject view from the copy.
+        Parameters
+        ----------
+        subject_id : int
+          ID of mouse to pull information about.
+
+        Returns
+        -------
+        Optional[List[Subject]]
+          None if the copy is stale. An empty list if the subject is unknown.
+
+        """
+        if not self.is_fresh:
+            return None
+        with self._lock:
+            return list(self._subjects.get(subject_id, []))
+
+    def get_task_view(self, subject_id: int) -> Optional[List[Task]]:
+        """
+        Get a task view from the copy.
+        Parameters
+        ----------
+        subject_id : int
+          ID of mouse to pull information about.
+
+        Returns
+        -------
+        Optional[List[Task]]
+          None if the copy is stale. An empty list if the subject has no
+          tasks.
+
+        """
+        if not self.is_fresh:
+            return None
+        with self._lock:
+            return list(self._tasks.get(subject_id, []))
+
+    def _run(self, session_factory: Callable[[], Session], interval: float):
+        """Refresh the copy every interval seconds until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                with session_factory() as session:
+                    self.refresh(session)
+            except Exception as e:
+                logging.warning(f"Materialized view refresh failed: {e}")
+            self._stop_event.wait(interval)
+
+    def start(
+        self, session_factory: Callable[[], Session], interval: float
+    ) -> None:
+        """
+        Start refreshing the copy in a background thread.
+        Parameters
+        ----------
+        session_factory : Callable[[], Session]
+          Creates the LabTracks session used for each refresh.
+        interval : float
+          Number of seconds to wait between refreshes.
+        """
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(session_factory, interval),
+            name="materialized-views",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh and wait for it to finish."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
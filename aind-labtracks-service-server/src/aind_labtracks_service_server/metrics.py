@@ -0,0 +1,166 @@
+"""Module for Prometheus metrics about the service"""
+
+import time
+from typing import Any, Callable, Dict, Iterator
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_DURATION = Histogram(
+    "labtracks_request_duration_seconds",
+    "Time spent handling a request.",
+    ["method", "route", "status"],
+)
+QUERY_DURATION = Histogram(
+    "labtracks_query_duration_seconds",
+    "Time spent running a LabTracks query and fetching its rows.",
+    ["query"],
+)
+QUERY_ROWS = Histogram(
+    "labtracks_query_rows",
+    "Number of rows returned by a LabTracks query.",
+    ["query"],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+)
+STATEMENT_DURATION = Histogram(
+    "labtracks_statement_duration_seconds",
+    "Time spent executing a SQL statement, labeled by its query.",
+    ["query"],
+)
+COALESCED_CALLS = Counter(
+    "labtracks_coalesced_calls",
+    "Number of lookups that waited for an identical query in flight.",
+    ["query"],
+)
+XML_PARSE_DURATION = Histogram(
+    "labtracks_xml_parse_duration_seconds",
+    "Time spent parsing a MouseCustomClass xml string.",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001),
+)
+
+
+class RequestDurationMiddleware:
+    """
+    Records how long each request takes, up to the last body message sent,
+    so that streamed responses are timed until they finish. Requests are
+    labeled by the route template rather than the path, so that subject ids
+    do not each create a new time series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Class constructor"""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Run the request and time it until the response is complete."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = None
+
+        async def send_wrapper(message: Message):
+            """Note the status and stop the timer on the last body."""
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                route = scope.get("route")
+                REQUEST_DURATION.labels(
+                    method=scope["method"],
+                    route=route.path if route is not None else "unmatched",
+                    status=status,
+                ).observe(time.perf_counter() - start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class ServiceCollector(Collector):
+    """
+    Collects response cache counters and connection pool usage when the
+    metrics are scraped, rather than updating them on every request. The
+    caches and pool are looked up on each scrape because they are created
+    lazily.
+    """
+
+    def __init__(
+        self,
+        get_caches: Callable[[], Dict[str, Any]],
+        get_pool: Callable[[], Any],
+    ):
+        """
+        Class constructor
+        Parameters
+        ----------
+        get_caches : Callable[[], Dict[str, Any]]
+          Returns the response caches to report, keyed by name.
+        get_pool : Callable[[], Any]
+          Returns the SQLAlchemy connection pool to report.
+        """
+        self.get_caches = get_caches
+        self.get_pool = get_pool
+
+    @staticmethod
+    def _families() -> Dict[str, Any]:
+        """Create the metric families reported by the collector."""
+        return {
+            "lookups": CounterMetricFamily(
+                "labtracks_cache_lookups",
+                "Response cache lookups by result.",
+                labels=["cache", "result"],
+            ),
+            "hit_ratio": GaugeMetricFamily(
+                "labtracks_cache_hit_ratio",
+                "Share of response cache lookups served from memory or Redis.",
+                labels=["cache"],
+            ),
+            "size": GaugeMetricFamily(
+                "labtracks_cache_entries",
+                "Number of entries held in memory by a response cache.",
+                labels=["cache"],
+            ),
+            "connections": GaugeMetricFamily(
+                "labtracks_pool_connections",
+                "LabTracks database connections by state.",
+                labels=["state"],
+            ),
+            "pool_size": GaugeMetricFamily(
+                "labtracks_pool_size",
+                "Configured size of the connection pool.",
+            ),
+        }
+
+    def describe(self) -> Iterator[Any]:
+        """
+        Yield the metrics without values. The registry calls this when the
+        collector is registered, before the caches and pool exist.
+        """
+        yield from self._families().values()
+
+    def collect(self) -> Iterator[Any]:
+        """Yield the cache and pool metrics."""
+        families = self._families()
+        for name, cache in self.get_caches().items():
+            stats = cache.stats()
+            families["lookups"].add_metric([name, "hit"], stats.hits)
+            families["lookups"].add_metric(
+                [name, "shared_hit"], stats.shared_hits
+            )
+            families["lookups"].add_metric([name, "miss"], stats.misses)
+            total = stats.hits + stats.shared_hits + stats.misses
+            families["hit_ratio"].add_metric(
+                [name],
+                (stats.hits + stats.shared_hits) / total if total else 0.0,
+            )
+            families["size"].add_metric([name], stats.size)
+        pool = self.get_pool()
+        families["connections"].add_metric(["checked_in"], pool.checkedin())
+        families["connections"].add_metric(["checked_out"], pool.checkedout())
+        families["connections"].add_metric(["overflow"], pool.overflow())
+        families["pool_size"].add_metric([], pool.size())
+        yield from families.values()
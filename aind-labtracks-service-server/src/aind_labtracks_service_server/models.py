@@ -4,7 +4,9 @@ import logging
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Any, Literal, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional
+from xml.etree import ElementTree
 from xml.etree.ElementTree import ParseError
 
 from pydantic import BaseModel, ValidationError, field_validator
@@ -12,6 +14,7 @@ from pydantic_xml import BaseXmlModel, ParsingError, element
 from sqlmodel import Field, SQLModel
 
 from aind_labtracks_service_server import __version__
+from aind_labtracks_service_server.metrics import XML_PARSE_DURATION
 
 
 class HealthCheck(BaseModel):
@@ -21,6 +24,26 @@ class HealthCheck(BaseModel):
     service_version: str = __version__
 
 
+class PoolStatus(BaseModel):
+    """Response model for the state of the database connection pool."""
+
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+
+
+class CacheStats(BaseModel):
+    """Response model for the counters of a response cache."""
+
+    hits: int
+    shared_hits: int = 0
+    misses: int
+    size: int
+    max_entries: int
+    ttl: float
+
+
 class SexNames(str, Enum):
     """How LabTracks labels the sex of the species."""
 
@@ -580,6 +603,71 @@ class MouseCustomClass(
     )
 
 
+# Maps the xml tags of a MouseCustomClass to the model fields
+MOUSE_CUSTOM_CLASS_FIELDS = {
+    "Reserved_by": "reserved_by",
+    "Reserve_Date": "reserved_date",
+    "Reason": "reason",
+    "Solution": "solution",
+    "Full_Genotype": "full_genotype",
+    "Phenotype": "phenotype",
+}
+
+# Parents are shared by many littermates, so the same xml string is parsed
+# repeatedly. Parsed models are memoized and should be treated as read-only.
+XML_MEMO_SIZE = 4096
+
+
+def _fast_parse_mouse_custom_class(
+    xml_string: str,
+) -> Optional[MouseCustomClass]:
+    """
+    Parse a MouseCustomClass xml string in a single pass over the known tags.
+    Parameters
+    ----------
+    xml_string : str
+
+    Returns
+    -------
+    Optional[MouseCustomClass]
+      None if the xml has a shape this parser does not handle, such as a
+      different root tag, nested elements, or repeated tags.
+
+    """
+    root = ElementTree.fromstring(xml_string)
+    if root.tag != "MouseCustomClass":
+        return None
+    values = {}
+    for child in root:
+        field_name = MOUSE_CUSTOM_CLASS_FIELDS.get(child.tag)
+        if field_name is None:
+            continue
+        if len(child) > 0 or field_name in values:
+            return None
+        values[field_name] = child.text
+    return MouseCustomClass.model_construct(**values)
+
+
+@lru_cache(maxsize=XML_MEMO_SIZE)
+def parse_mouse_custom_class(xml_string: str) -> MouseCustomClass:
+    """
+    Parse a MouseCustomClass xml string. Uses the fast parser and falls back
+    to pydantic-xml for unexpected shapes. Results are memoized.
+    Parameters
+    ----------
+    xml_string : str
+
+    Returns
+    -------
+    MouseCustomClass
+
+    """
+    model = _fast_parse_mouse_custom_class(xml_string)
+    if model is None:
+        model = MouseCustomClass.from_xml(xml_string)
+    return model
+
+
 class Subject(SQLModel):
     """Expected Subject view of joined tables"""
 
@@ -612,7 +700,8 @@ class Subject(SQLModel):
         """
         if isinstance(v, str):
             try:
-                return MouseCustomClass.from_xml(v)
+                with XML_PARSE_DURATION.time():
+                    return parse_mouse_custom_class(v)
             except ValidationError as e:
                 logging.warning(f"Pydantic validation error: {e.json()}")
                 return None
@@ -641,3 +730,51 @@ class Task(SQLModel):
     protocol_number: Optional[str] = Field(default=None)
     protocol_title: Optional[str] = Field(default=None)
     task_status: Optional[str] = Field(default=None)
+
+
+class TaskFilters(BaseModel):
+    """Filters applied to the task view in the database"""
+
+    date_start_from: Optional[datetime] = Field(
+        default=None, description="Only tasks starting at or after this time."
+    )
+    date_start_to: Optional[datetime] = Field(
+        default=None, description="Only tasks starting at or before this time."
+    )
+    type_name: Optional[str] = Field(
+        default=None, description="Only tasks of this type, e.g. Surgery."
+    )
+    task_status: Optional[str] = Field(
+        default=None, description="Only tasks with this status, e.g. F."
+    )
+
+
+class ChangeFeed(BaseModel):
+    """Subjects and tasks modified in LabTracks after a timestamp"""
+
+    since: datetime = Field(
+        ..., description="Changes after this time are returned."
+    )
+    watermark: Optional[datetime] = Field(
+        default=None,
+        description=(
+            "Latest row_modified timestamp in LabTracks when the changes were "
+            "read. Pass it as since to get the next changes. Changes shortly "
+            "before it are returned again, so expect duplicates."
+        ),
+    )
+    subject_ids: List[int] = Field(
+        default_factory=list,
+        description="Subjects whose subject view changed.",
+    )
+    task_subject_ids: List[int] = Field(
+        default_factory=list, description="Subjects whose task view changed."
+    )
+    subjects: Optional[Dict[int, List[Subject]]] = Field(
+        default=None,
+        description="Subject views of the changed subjects, if requested.",
+    )
+    tasks: Optional[Dict[int, List[Task]]] = Field(
+        default=None,
+        description="Task views of the changed subjects, if requested.",
+    )
@@ -0,0 +1,110 @@
+"""Module for profiling individual requests"""
+
+import cProfile
+import io
+import logging
+import pstats
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from aind_labtracks_service_server.session import get_settings
+
+PROFILE_HEADER = "X-Debug-Profile"
+
+# Set by the profiling middleware for requests that ask to be profiled. The
+# context is copied into the worker thread that runs a sync endpoint.
+current_profiler: ContextVar[Optional[cProfile.Profile]] = ContextVar(
+    "current_profiler", default=None
+)
+
+
+def profiled(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a sync endpoint so that it runs under the request's profiler, if
+    there is one. Sync endpoints run in a worker thread, which a profiler
+    started in the middleware would not see. Async endpoints that hand work
+    to a worker thread can wrap the function they run there.
+    """
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        """Run the endpoint with the current profiler enabled."""
+        profiler = current_profiler.get()
+        if profiler is None:
+            return endpoint(*args, **kwargs)
+        profiler.enable()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.disable()
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose sync endpoint can be profiled per request."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        """Class constructor"""
+        if not iscoroutinefunction(endpoint):
+            endpoint = profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def format_profile(profiler: cProfile.Profile, limit: int = 30) -> str:
+    """
+    Render the slowest functions of a profile as text.
+    Parameters
+    ----------
+    profiler : cProfile.Profile
+      Profiler that ran during a request.
+    limit : int
+      Number of functions to include, sorted by cumulative time.
+
+    Returns
+    -------
+    str
+
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    If profiling is enabled, profile requests that send the debug header and
+    log the slowest functions. Written as plain ASGI middleware so that other
+    requests pass straight through to the app.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Class constructor"""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Run the request, under a profiler if it asks for one."""
+        if (
+            scope["type"] != "http"
+            or not get_settings().profiling_enabled
+            or PROFILE_HEADER not in Headers(scope=scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        profiler = cProfile.Profile()
+        token = current_profiler.set(profiler)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_profiler.reset(token)
+        logging.info(
+            f"Profile for {scope['method']} {scope['path']}:\n"
+            f"{format_profile(profiler)}"
+        )
@@ -1,19 +1,478 @@
 """Module to handle subject endpoint responses"""
 
-from typing import List
+import gzip
+import hashlib
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
 
-from fastapi import APIRouter, Depends, Path, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from pydantic import BaseModel, TypeAdapter
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from aind_labtracks_service_server.handler import SessionHandler
+from aind_labtracks_service_server import __version__ as service_version
+from aind_labtracks_service_server.cache import (
+    ResponseCache,
+    create_redis_client,
+)
+from aind_labtracks_service_server.handler import (
+    AsyncSessionHandler,
+    SessionHandler,
+)
+from aind_labtracks_service_server.materialized import MaterializedViews
+from aind_labtracks_service_server.metrics import ServiceCollector
 from aind_labtracks_service_server.models import (
+    CacheStats,
+    ChangeFeed,
     HealthCheck,
+    PoolStatus,
     Subject,
     Task,
+    TaskFilters,
 )
-from aind_labtracks_service_server.session import get_session
+from aind_labtracks_service_server.profiling import ProfiledRoute, profiled
+from aind_labtracks_service_server.session import (
+    get_async_session,
+    get_engine,
+    get_session,
+    get_settings,
+)
+from aind_labtracks_service_server.singleflight import SingleFlight
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@lru_cache(maxsize=None)
+def get_caches() -> Dict[str, ResponseCache]:
+    """
+    Create the response caches on first use, keyed by name. The subject and
+    tasks caches hold the rendered JSON body, so a hit skips both the
+    database and pydantic serialization. The gzip cache holds the
+    compressed bodies of cached responses, keyed by ETag, so that hot
+    entries are compressed once rather than by the middleware on every hit.
+    It is only held in memory because a body's ETag never goes stale.
+    """
+    settings = get_settings()
+    redis_client = (
+        None
+        if settings.redis_url is None
+        else create_redis_client(settings.redis_url)
+    )
+    redis_key_prefix = f"{settings.redis_key_prefix}:{service_version}"
+    return {
+        "subject": ResponseCache(
+            ttl=settings.subject_cache_ttl,
+            max_entries=settings.subject_cache_max_entries,
+            redis_client=redis_client,
+            key_prefix=f"{redis_key_prefix}:subject:",
+        ),
+        "tasks": ResponseCache(
+            ttl=settings.task_cache_ttl,
+            max_entries=settings.task_cache_max_entries,
+            redis_client=redis_client,
+            key_prefix=f"{redis_key_prefix}:tasks:",
+        ),
+        "gzip": ResponseCache(
+            ttl=max(settings.subject_cache_ttl, settings.task_cache_ttl),
+            max_entries=(
+                settings.subject_cache_max_entries
+                + settings.task_cache_max_entries
+            ),
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_materialized_views() -> MaterializedViews:
+    """
+    Create the materialized views on first use. They are filled in by a
+    background refresh if settings.materialize_views is set. Otherwise they
+    are never fresh and reads go to LabTracks.
+    """
+    settings = get_settings()
+    return MaterializedViews(
+        max_staleness=settings.materialize_max_staleness,
+        full_refresh_interval=settings.materialize_full_refresh_interval,
+        overlap=settings.row_modified_overlap,
+    )
+
+
+REGISTRY.register(
+    ServiceCollector(get_caches=get_caches, get_pool=lambda: get_engine().pool)
+)
+# Concurrent cache misses for the same view share a single LabTracks query.
+subject_flight = SingleFlight("subject_view")
+task_flight = SingleFlight("task_view")
+# The views are validated once by the handler. Endpoints dump them to JSON
+# bytes with these adapters and return a Response, which FastAPI sends as is
+# instead of validating against the response_model again.
+subjects_adapter = TypeAdapter(List[Subject])
+tasks_adapter = TypeAdapter(List[Task])
+subjects_by_id_adapter = TypeAdapter(Dict[int, List[Subject]])
+tasks_by_id_adapter = TypeAdapter(Dict[int, List[Task]])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+SUBJECT_IDS_EXAMPLES = {
+    "default": {
+        "summary": "Sample subject IDs",
+        "description": "Example subject IDs for LabTracks",
+        "value": [632269, 623236],
+    }
+}
+
+
+def _parse_fields(
+    fields: Optional[str], model: Type[BaseModel]
+) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma separated list of field names into the model's field
+    order. The id is always included.
+    Parameters
+    ----------
+    fields : Optional[str]
+      Comma separated field names from the query string.
+    model : Type[BaseModel]
+      Model the field names belong to.
+
+    Returns
+    -------
+    Optional[Tuple[str, ...]]
+      None if no fields were requested.
+
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return tuple(
+        name
+        for name in model.model_fields
+        if name == "id" or name in requested
+    )
+
+
+def _cache_key(
+    subject_id: str, fields: Optional[Tuple[str, ...]]
+) -> Union[int, str]:
+    """Cache key for a subject id and the fields returned for it."""
+    if fields is None:
+        return int(subject_id)
+    return f"{int(subject_id)}:{','.join(fields)}"
+
+
+def _etag(content: bytes) -> str:
+    """Strong entity tag for a response body."""
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def _gzip(content: bytes) -> bytes:
+    """Gzip a response body. The mtime is fixed so the output is stable."""
+    return gzip.compress(
+        content, compresslevel=get_settings().gzip_compress_level, mtime=0
+    )
+
+
+def _json_response(
+    request: Request, content: bytes, precompress: bool = False
+) -> Response:
+    """
+    Build a json response with an ETag. If the request's If-None-Match
+    header already matches the ETag, a 304 is returned without the body.
+    Bodies of at least the gzip minimum size may be sent gzip encoded, so
+    their responses vary on Accept-Encoding. Precompressed bodies get their
+    own strong ETag with a -gzip suffix. Bodies left to the middleware get a
+    weak ETag, since the middleware encodes them without changing it.
+    Parameters
+    ----------
+    request : Request
+    content : bytes
+      Serialized json body.
+    precompress : bool
+      Whether to gzip a large body here, reusing the compressed bytes from
+      the gzip cache, instead of leaving it to the middleware. Used for bodies
+      served from a response cache.
+
+    Returns
+    -------
+    Response
+
+    """
+    etag = _etag(content)
+    compressible = len(content) >= get_settings().gzip_minimum_size
+    encode = (
+        precompress
+        and compressible
+        and "gzip" in request.headers.get("accept-encoding", "")
+    )
+    if encode:
+        headers = {"ETag": f'{etag[:-1]}-gzip"'}
+    elif compressible and not precompress:
+        headers = {"ETag": f"W/{etag}"}
+    else:
+        headers = {"ETag": etag}
+    if compressible and precompress:
+        headers["Vary"] = "Accept-Encoding"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+        # Tags of either coding match, since they share the same content.
+        tags = {
+            t.strip().removeprefix("W/").replace('-gzip"', '"')
+            for t in if_none_match.split(",")
+        }
+        if "*" in tags or etag in tags:
+            if compressible:
+                # The middleware skips empty bodies, so it would not add Vary
+                headers["Vary"] = "Accept-Encoding"
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+    if encode:
+        content = get_caches()["gzip"].get_or_set(etag, lambda: _gzip(content))
+        headers["Content-Encoding"] = "gzip"
+    return Response(
+        content=content, media_type="application/json", headers=headers
+    )
 
-router = APIRouter()
+
+def _set_cache_headers(
+    response: Response, cache_control: str, vary: Optional[str] = None
+) -> Response:
+    """Add Cache-Control and Vary headers to a response and return it."""
+    response.headers["Cache-Control"] = cache_control
+    if vary is not None:
+        response.headers.add_vary_header(vary)
+    return response
+
+
+def _get_subject_view(
+    session: Session, subject_id: str, fields: Optional[Tuple[str, ...]]
+) -> List[Subject]:
+    """Read a subject view from the materialized copy or from LabTracks."""
+    subjects = get_materialized_views().get_subject_view(int(subject_id))
+    if subjects is None:
+        subjects = subject_flight.do(
+            _cache_key(subject_id, fields),
+            lambda: SessionHandler(session=session).get_subject_view(
+                subject_id=subject_id, fields=fields
+            ),
+        )
+    return subjects
+
+
+def _get_task_view(
+    session: Session, subject_id: str, fields: Optional[Tuple[str, ...]]
+) -> List[Task]:
+    """Read a task view from the materialized copy or from LabTracks."""
+    tasks = get_materialized_views().get_task_view(int(subject_id))
+    if tasks is None:
+        tasks = task_flight.do(
+            _cache_key(subject_id, fields),
+            lambda: SessionHandler(session=session).get_task_view(
+                subject_id=subject_id, fields=fields
+            ),
+        )
+    return tasks
+
+
+async def _get_subject_view_async(
+    session: AsyncSession,
+    subject_id: str,
+    fields: Optional[Tuple[str, ...]],
+) -> List[Subject]:
+    """Async variant of _get_subject_view."""
+    subjects = get_materialized_views().get_subject_view(int(subject_id))
+    if subjects is None:
+        subjects = await subject_flight.do_async(
+            _cache_key(subject_id, fields),
+            lambda: AsyncSessionHandler(session=session).get_subject_view(
+                subject_id=subject_id, fields=fields
+            ),
+        )
+    return subjects
+
+
+async def _get_task_view_async(
+    session: AsyncSession,
+    subject_id: str,
+    fields: Optional[Tuple[str, ...]],
+) -> List[Task]:
+    """Async variant of _get_task_view."""
+    tasks = get_materialized_views().get_task_view(int(subject_id))
+    if tasks is None:
+        tasks = await task_flight.do_async(
+            _cache_key(subject_id, fields),
+            lambda: AsyncSessionHandler(session=session).get_task_view(
+                subject_id=subject_id, fields=fields
+            ),
+        )
+    return tasks
+
+
+def _include(fields: Optional[Tuple[str, ...]]) -> Optional[dict]:
+    """Include argument that dumps only the given fields of each model."""
+    return None if fields is None else {"__all__": set(fields)}
+
+
+def _subject_response(request: Request, content: bytes) -> Response:
+    """Response for a subject view body from the response cache."""
+    return _set_cache_headers(
+        _json_response(request, content, precompress=True),
+        get_settings().subject_cache_control,
+    )
+
+
+def _tasks_response(request: Request, content: bytes) -> Response:
+    """Response for a task view body from the response cache."""
+    return _set_cache_headers(
+        _json_response(request, content, precompress=True),
+        get_settings().task_cache_control,
+        vary="Accept",
+    )
+
+
+def _tasks_page_response(
+    request: Request,
+    tasks: List[Task],
+    limit: Optional[int],
+    fields: Optional[Tuple[str, ...]],
+) -> Response:
+    """
+    Response for a page or a filtered list of tasks. If the page is full,
+    the X-Next-Cursor and Link headers point to the next page.
+    """
+    response = _json_response(
+        request, tasks_adapter.dump_json(tasks, include=_include(fields))
+    )
+    if limit is not None and len(tasks) == limit:
+        next_cursor = str(int(tasks[-1].id))
+        next_url = request.url.include_query_params(after=next_cursor)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return _set_cache_headers(
+        response, get_settings().task_cache_control, vary="Accept"
+    )
+
+
+@profiled
+def _get_subject_sync(
+    request: Request,
+    session: Session,
+    subject_id: str,
+    fields: Optional[Tuple[str, ...]],
+) -> Response:
+    """Serve a subject view with the sync session in a worker thread."""
+    content = get_caches()["subject"].get_or_set(
+        _cache_key(subject_id, fields),
+        lambda: subjects_adapter.dump_json(
+            _get_subject_view(session, subject_id, fields),
+            include=_include(fields),
+        ),
+    )
+    return _subject_response(request, content)
+
+
+@profiled
+def _get_tasks_sync(
+    request: Request,
+    session: Session,
+    subject_id: str,
+    stream: bool,
+    limit: Optional[int],
+    after: Optional[int],
+    filters: TaskFilters,
+    fields: Optional[Tuple[str, ...]],
+) -> Response:
+    """Serve a task view with the sync session in a worker thread."""
+    session_handler = SessionHandler(session=session)
+    if stream:
+        tasks = session_handler.iter_task_view(
+            subject_id=subject_id,
+            limit=limit,
+            after=after,
+            filters=filters,
+            fields=fields,
+        )
+        return _set_cache_headers(
+            StreamingResponse(
+                _ndjson_lines(tasks, fields=fields),
+                media_type=NDJSON_MEDIA_TYPE,
+            ),
+            get_settings().task_cache_control,
+            vary="Accept",
+        )
+    if limit is None and after is None and filters == TaskFilters():
+        content = get_caches()["tasks"].get_or_set(
+            _cache_key(subject_id, fields),
+            lambda: tasks_adapter.dump_json(
+                _get_task_view(session, subject_id, fields),
+                include=_include(fields),
+            ),
+        )
+        return _tasks_response(request, content)
+    tasks = session_handler.get_task_view(
+        subject_id=subject_id,
+        limit=limit,
+        after=after,
+        filters=filters,
+        fields=fields,
+    )
+    return _tasks_page_response(request, tasks, limit, fields)
+
+
+def _subjects_by_id_response(
+    subject_ids: List[int], session: Session
+) -> Response:
+    """Look up subjects for several ids and serialize them grouped by id."""
+    lab_tracks_subjects = SessionHandler(session=session).get_subject_views(
+        subject_ids=subject_ids
+    )
+    return Response(
+        content=subjects_by_id_adapter.dump_json(lab_tracks_subjects),
+        media_type="application/json",
+    )
+
+
+def _tasks_by_id_response(
+    subject_ids: List[int], session: Session
+) -> Response:
+    """Look up tasks for several subject ids and serialize them by id."""
+    lab_tracks_tasks = SessionHandler(session=session).get_task_views(
+        subject_ids=subject_ids
+    )
+    return Response(
+        content=tasks_by_id_adapter.dump_json(lab_tracks_tasks),
+        media_type="application/json",
+    )
+
+
+def _ndjson_lines(
+    tasks: Iterator[Task], fields: Optional[Tuple[str, ...]] = None
+) -> Iterator[bytes]:
+    """Render each task as one line of newline delimited json."""
+    include = None if fields is None else set(fields)
+    for task in tasks:
+        yield (task.model_dump_json(include=include) + "\n").encode()
 
 
 @router.get(
@@ -34,11 +493,65 @@ def get_health() -> HealthCheck:
     return HealthCheck()
 
 
+@router.get(
+    "/diagnostics/pool",
+    tags=["diagnostics"],
+    summary="Report database connection pool usage",
+    response_model=PoolStatus,
+)
+def get_pool_status() -> PoolStatus:
+    """
+    Endpoint to check how many LabTracks connections are in use.
+
+    Returns:
+        PoolStatus: Returns a JSON response with the pool counts
+    """
+    pool = get_engine().pool
+    return PoolStatus(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+    )
+
+
+@router.get(
+    "/diagnostics/cache",
+    tags=["diagnostics"],
+    summary="Report response cache hit and miss counts",
+    response_model=Dict[str, CacheStats],
+)
+def get_cache_stats() -> Dict[str, CacheStats]:
+    """
+    Endpoint to check how well the subject and task caches are performing.
+
+    Returns:
+        Dict[str, CacheStats]: Returns a JSON response with cache counters
+    """
+    return {name: cache.stats() for name, cache in get_caches().items()}
+
+
+@router.get(
+    "/metrics",
+    tags=["diagnostics"],
+    summary="Report metrics in the Prometheus text format",
+    response_class=Response,
+    responses={200: {"content": {CONTENT_TYPE_LATEST: {}}}},
+)
+def get_metrics():
+    """
+    Endpoint for Prometheus to scrape request, query and xml parsing
+    latencies, rows returned, cache hit ratios and pool usage.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @router.get(
     "/subject/{subject_id}",
     response_model=List[Subject],
 )
-def get_subject(
+async def get_subject(
+    request: Request,
     subject_id: str = Path(
         ...,
         openapi_examples={
@@ -49,23 +562,94 @@ def get_subject(
             }
         },
     ),
+    fields: Optional[str] = Query(
+        None,
+        description=(
+            "Comma separated subject fields to return, e.g. sex,birth_date."
+            " The id is always returned."
+        ),
+    ),
     session: Session = Depends(get_session),
+    async_session: Optional[AsyncSession] = Depends(get_async_session),
 ):
     """
     ## Subject metadata
-    Retrieves subject information from LabTracks.
+    Retrieves subject information from LabTracks. Use fields to only return
+    some of the subject fields, which also skips the joins and parsing that
+    the other fields need. Responses carry an ETag, and a request whose
+    If-None-Match header matches it is answered with a 304.
     """
-    lab_tracks_subjects = SessionHandler(session=session).get_subject_view(
-        subject_id=subject_id
+    field_names = _parse_fields(fields, Subject)
+    if async_session is None:
+        return await run_in_threadpool(
+            _get_subject_sync, request, session, subject_id, field_names
+        )
+
+    async def dump_subject_view() -> bytes:
+        """Query the subject view without blocking and serialize it."""
+        subjects = await _get_subject_view_async(
+            async_session, subject_id, field_names
+        )
+        return subjects_adapter.dump_json(
+            subjects, include=_include(field_names)
+        )
+
+    content = await get_caches()["subject"].get_or_set_async(
+        _cache_key(subject_id, field_names), dump_subject_view
     )
-    return lab_tracks_subjects
+    return _subject_response(request, content)
+
+
+@router.get(
+    "/subjects",
+    response_model=Dict[int, List[Subject]],
+)
+def get_subjects(
+    subject_ids: List[int] = Query(..., openapi_examples=SUBJECT_IDS_EXAMPLES),
+    session: Session = Depends(get_session),
+):
+    """
+    ## Subject metadata for several subjects
+    Retrieves subject information from LabTracks for a list of subject ids in
+    a single request. Results are grouped by subject id. For more ids than
+    fit in a URL, use POST /subjects.
+    """
+    return _set_cache_headers(
+        _subjects_by_id_response(subject_ids, session),
+        get_settings().subject_cache_control,
+    )
+
+
+@router.post(
+    "/subjects",
+    response_model=Dict[int, List[Subject]],
+)
+def post_subjects(
+    subject_ids: List[int] = Body(..., openapi_examples=SUBJECT_IDS_EXAMPLES),
+    session: Session = Depends(get_session),
+):
+    """
+    ## Subject metadata for several subjects
+    Retrieves subject information from LabTracks for a json list of subject
+    ids sent in the request body. Results are grouped by subject id.
+    """
+    return _subjects_by_id_response(subject_ids, session)
 
 
 @router.get(
     "/tasks/{subject_id}",
     response_model=List[Task],
+    responses={
+        200: {
+            "content": {NDJSON_MEDIA_TYPE: {}},
+            "description": (
+                "A json list, or one task per line if streaming is requested."
+            ),
+        }
+    },
 )
-def get_tasks(
+async def get_tasks(
+    request: Request,
     subject_id: str = Path(
         ...,
         openapi_examples={
@@ -76,13 +660,181 @@ def get_tasks(
             }
         },
     ),
+    stream: bool = Query(
+        False,
+        description=(
+            "Stream tasks as newline delimited json. Also enabled by an "
+            f"Accept header of {NDJSON_MEDIA_TYPE}."
+        ),
+    ),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        description=(
+            "Maximum number of tasks to return. When limit or after is set, "
+            "tasks are ordered by id."
+        ),
+    ),
+    after: Optional[int] = Query(
+        None,
+        description=(
+            "Only return tasks with an id greater than this cursor. Use the "
+            "X-Next-Cursor header of the previous page."
+        ),
+    ),
+    date_start_from: Optional[datetime] = Query(
+        None, description="Only tasks starting at or after this time."
+    ),
+    date_start_to: Optional[datetime] = Query(
+        None, description="Only tasks starting at or before this time."
+    ),
+    type_name: Optional[str] = Query(
+        None, description="Only tasks of this type, e.g. Surgery."
+    ),
+    task_status: Optional[str] = Query(
+        None, description="Only tasks with this status, e.g. F."
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description=(
+            "Comma separated task fields to return, e.g. type_name,date_start."
+            " The id is always returned."
+        ),
+    ),
     session: Session = Depends(get_session),
+    async_session: Optional[AsyncSession] = Depends(get_async_session),
 ):
     """
     ## Task metadata
-    Retrieves Task information from LabTracks.
+    Retrieves Task information from LabTracks. Tasks can be filtered by start
+    date, type and status. Use limit and after to page through the tasks. If
+    a page is full, the X-Next-Cursor and Link headers point to the next page.
+    Use fields to only return some of the task fields. Json responses carry
+    an ETag, and a request whose If-None-Match header matches it is answered
+    with a 304.
     """
-    lab_tracks_tasks = SessionHandler(session=session).get_task_view(
-        subject_id=subject_id
+    field_names = _parse_fields(fields, Task)
+    filters = TaskFilters(
+        date_start_from=date_start_from,
+        date_start_to=date_start_to,
+        type_name=type_name,
+        task_status=task_status,
+    )
+    stream = stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    # Streamed tasks are read from the sync cursor in a worker thread
+    if async_session is None or stream:
+        return await run_in_threadpool(
+            _get_tasks_sync,
+            request,
+            session,
+            subject_id,
+            stream,
+            limit,
+            after,
+            filters,
+            field_names,
+        )
+    if limit is None and after is None and filters == TaskFilters():
+
+        async def dump_task_view() -> bytes:
+            """Query the task view without blocking and serialize it."""
+            tasks = await _get_task_view_async(
+                async_session, subject_id, field_names
+            )
+            return tasks_adapter.dump_json(
+                tasks, include=_include(field_names)
+            )
+
+        content = await get_caches()["tasks"].get_or_set_async(
+            _cache_key(subject_id, field_names), dump_task_view
+        )
+        return _tasks_response(request, content)
+    tasks = await AsyncSessionHandler(session=async_session).get_task_view(
+        subject_id=subject_id,
+        limit=limit,
+        after=after,
+        filters=filters,
+        fields=field_names,
+    )
+    return _tasks_page_response(request, tasks, limit, field_names)
+
+
+@router.get(
+    "/tasks",
+    response_model=Dict[int, List[Task]],
+)
+def get_tasks_for_subjects(
+    subject_ids: List[int] = Query(..., openapi_examples=SUBJECT_IDS_EXAMPLES),
+    session: Session = Depends(get_session),
+):
+    """
+    ## Task metadata for several subjects
+    Retrieves Task information from LabTracks for a list of subject ids in a
+    single request. Results are grouped by subject id. For more ids than fit
+    in a URL, use POST /tasks.
+    """
+    return _set_cache_headers(
+        _tasks_by_id_response(subject_ids, session),
+        get_settings().task_cache_control,
+    )
+
+
+@router.post(
+    "/tasks",
+    response_model=Dict[int, List[Task]],
+)
+def post_tasks_for_subjects(
+    subject_ids: List[int] = Body(..., openapi_examples=SUBJECT_IDS_EXAMPLES),
+    session: Session = Depends(get_session),
+):
+    """
+    ## Task metadata for several subjects
+    Retrieves Task information from LabTracks for a json list of subject ids
+    sent in the request body. Results are grouped by subject id.
+    """
+    return _tasks_by_id_response(subject_ids, session)
+
+
+@router.get(
+    "/changes",
+    response_model=ChangeFeed,
+)
+def get_changes(
+    since: datetime = Query(
+        ...,
+        description=(
+            "Return subjects and tasks modified after this time. Use the "
+            "watermark of the previous response to sync incrementally. "
+            "Changes shortly before this time are returned again, so expect "
+            "duplicates."
+        ),
+        openapi_examples={
+            "default": {
+                "summary": "A sample timestamp",
+                "description": "Changes made in LabTracks since 2024",
+                "value": "2024-01-01T00:00:00",
+            }
+        },
+    ),
+    include_views: bool = Query(
+        False,
+        description="Also return the views of the changed subjects.",
+    ),
+    session: Session = Depends(get_session),
+):
+    """
+    ## Change feed
+    Retrieves the ids of subjects whose subject or task views were modified
+    in LabTracks after a timestamp, and optionally the views themselves.
+    Rows modified up to row_modified_overlap seconds before the timestamp are
+    included too, since they may have been committed after the previous
+    watermark was read. Consumers must expect the same subjects again.
+    """
+    changes = SessionHandler(session=session).get_changes(
+        since=since,
+        include_views=include_views,
+        overlap=timedelta(seconds=get_settings().row_modified_overlap),
+    )
+    return Response(
+        content=changes.model_dump_json(), media_type="application/json"
     )
-    return lab_tracks_tasks
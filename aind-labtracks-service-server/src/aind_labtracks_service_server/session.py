@@ -1,18 +1,156 @@
 """Module to handle LabTracks database session"""
 
+import hashlib
+import logging
+import re
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from aind_labtracks_service_server.configs import Settings
+from aind_labtracks_service_server.metrics import STATEMENT_DURATION
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Load the settings on first use. They are pulled from env and may be
+    pulled from AWS Secrets Manager, so they are not loaded on import.
+    """
+    return Settings()
+
+
+@lru_cache(maxsize=256)
+def statement_fingerprint(statement: str) -> str:
+    """
+    Identify a SQL statement regardless of its parameters. Whitespace is
+    collapsed, numeric literals such as the TOP n that SQL Server inlines for
+    limits are replaced, and expanded IN lists of any length are treated the
+    same.
+    Parameters
+    ----------
+    statement : str
+      SQL statement sent to the database.
+
+    Returns
+    -------
+    str
+      Short hash of the normalized statement.
+
+    """
+    normalized = re.sub(r"\s+", " ", statement).strip()
+    normalized = re.sub(r"\b\d+\b", "?", normalized)
+    normalized = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(?)", normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
 
-# Settings will be pulled from env
-settings = Settings()
 
-engine = create_engine(url=settings.db_connection_str)
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    """Note when a statement starts executing."""
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
 
-session_local = sessionmaker(
-    bind=engine, class_=Session, expire_on_commit=False
-)
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    """
+    Record how long a statement took and log it if it was slow. Statements
+    are labeled by the query execution option the handler sets, so that the
+    number of time series stays bounded. The fingerprint is only logged.
+    """
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    query = (
+        "other"
+        if context is None
+        else context.execution_options.get("query", "other")
+    )
+    STATEMENT_DURATION.labels(query).observe(duration)
+    if duration > get_settings().slow_query_threshold:
+        logging.warning(
+            f"Slow query {query} {statement_fingerprint(statement)} took "
+            f"{duration:.3f}s: {statement}"
+        )
+
+
+def add_query_listeners(engine: Any) -> None:
+    """
+    Time every statement executed by an engine.
+    Parameters
+    ----------
+    engine : Any
+      Engine to listen to. For an AsyncEngine, pass its sync_engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """
+    Create the engine on first use, which is in the app's lifespan. Each
+    worker process creates its own engine and pool.
+    """
+    settings = get_settings()
+    engine = create_engine(
+        url=settings.db_connection_str,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+    )
+    add_query_listeners(engine)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_session_local() -> sessionmaker:
+    """Create the session factory bound to the engine on first use."""
+    return sessionmaker(
+        bind=get_engine(), class_=Session, expire_on_commit=False
+    )
+
+
+def prewarm_engine(engine: Engine, connections: int) -> int:
+    """
+    Open pooled connections up front, so that the first requests do not
+    wait for a login to LabTracks. The connections are held at the same
+    time so that each one is new, then returned to the pool. Errors are
+    logged rather than raised, so the app can still start while LabTracks
+    is unavailable.
+    Parameters
+    ----------
+    engine : Engine
+    connections : int
+      Number of connections to open. Should not exceed the pool size, since
+      connections beyond it are closed when they are returned.
+
+    Returns
+    -------
+    int
+      Number of connections that were opened.
+
+    """
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    except Exception as e:
+        logging.warning(
+            f"Prewarming the pool stopped after {len(opened)} "
+            f"connections: {e.args}"
+        )
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
 
 
 def get_session():
@@ -20,8 +158,43 @@ def get_session():
     Yield a session object. This will automatically close the session when
     finished.
     """
-    session = session_local()
+    session = get_session_local()()
     try:
         yield session
     finally:
         session.close()
+
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """
+    Create the async engine on first use, which is in the app's lifespan if
+    async queries are enabled. The aioodbc driver is optional, so it is not
+    imported unless the async path is used.
+    """
+    settings = get_settings()
+    async_engine = create_async_engine(
+        url=settings.async_db_connection_str,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+    )
+    add_query_listeners(async_engine.sync_engine)
+    return async_engine
+
+
+async def get_async_session() -> AsyncIterator[Optional[AsyncSession]]:
+    """
+    Yield an async session object if async queries are enabled, otherwise
+    None, in which case routes use the sync session. This will automatically
+    close the session when finished.
+    """
+    if not get_settings().async_queries:
+        yield None
+        return
+    async with AsyncSession(
+        get_async_engine(), expire_on_commit=False
+    ) as session:
+        yield session
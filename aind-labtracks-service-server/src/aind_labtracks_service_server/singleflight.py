@@ -0,0 +1,116 @@
+"""Module for coalescing concurrent identical LabTracks queries"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from aind_labtracks_service_server.metrics import COALESCED_CALLS
+
+
+class _Call:
+    """A call in flight and, once it is done, its result or error."""
+
+    def __init__(self):
+        """Class constructor"""
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Threads that ask for a key
+    while a call for it is in flight wait for that call and share its
+    result, or its exception, instead of running their own. Nothing is kept
+    once the call returns, so later calls run again. Coroutines coalesce in
+    the same way with do_async.
+    """
+
+    def __init__(self, name: str):
+        """
+        Class constructor
+        Parameters
+        ----------
+        name : str
+          Label for the coalesced calls metric, e.g. subject_view.
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._async_calls: Dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Run func for a key, or wait for the call already running for it.
+        Parameters
+        ----------
+        key : Hashable
+        func : Callable[[], Any]
+          Called without arguments if no call for the key is in flight.
+
+        Returns
+        -------
+        Any
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+        if not is_leader:
+            COALESCED_CALLS.labels(self.name).inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Await func for a key, or wait for the call already running for it.
+        The calls run on the event loop, so no lock is needed.
+        Parameters
+        ----------
+        key : Hashable
+        func : Callable[[], Awaitable[Any]]
+          Called without arguments if no call for the key is in flight.
+
+        Returns
+        -------
+        Any
+
+        """
+        future = self._async_calls.get(key)
+        if future is not None:
+            COALESCED_CALLS.labels(self.name).inc()
+            # Shielded, so a cancelled waiter does not cancel the call
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = future
+        try:
+            result = await func()
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the error as retrieved in case nothing waited for it
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._async_calls[key]
@@ -10,8 +10,11 @@ import pytest
 from fastapi.testclient import TestClient
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel, create_engine
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from aind_labtracks_service_server.main import app
 from aind_labtracks_service_server.models import (
@@ -26,6 +29,10 @@ from aind_labtracks_service_server.models import (
     TaskSetObject,
     TaskType,
 )
+from aind_labtracks_service_server.route import get_caches
+from aind_labtracks_service_server.session import (
+    get_async_session as get_lb_async_session,
+)
 from aind_labtracks_service_server.session import get_session as get_lb_session
 
 RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
@@ -95,20 +102,8 @@ def test_labtracks_task():
     )
 
 
-@pytest.fixture(scope="session")
-def get_labtracks_session():
-    """Generate a sqlite database to query lab_tracks data."""
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        echo=True,
-    )
-    SQLModel.metadata.create_all(engine)
-    session_local = sessionmaker(
-        autocommit=False, autoflush=False, bind=engine
-    )
-    session = session_local()
-    # Load sqlite db with test data
+def load_test_db(session: Session):
+    """Load the test data into the database bound to a session."""
     with open(RESOURCES_DIR / "test_db.json", "r") as f:
         test_db = json.load(f)
     for ac_row in test_db["animals_common"]:
@@ -132,6 +127,23 @@ def get_labtracks_session():
     for ap_row in test_db["acuc_protocol"]:
         ap = AcucProtocol.model_validate(ap_row)
         session.add(ap)
+
+
+@pytest.fixture(scope="session")
+def get_labtracks_session():
+    """Generate a sqlite database to query lab_tracks data."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        echo=True,
+    )
+    SQLModel.metadata.create_all(engine)
+    session_local = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine
+    )
+    session = session_local()
+    load_test_db(session)
     session.commit()
     try:
         yield session
@@ -140,6 +152,50 @@ def get_labtracks_session():
         session.close()
 
 
+@pytest.fixture(scope="session")
+def labtracks_async_engine(tmp_path_factory):
+    """
+    Generate a file-backed sqlite database to query lab_tracks data with
+    aiosqlite. Connections are not pooled, so the engine can be used from
+    the event loops of both the tests and the test client.
+    """
+    db_path = tmp_path_factory.mktemp("labtracks") / "labtracks.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        load_test_db(session)
+        session.commit()
+    engine.dispose()
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool
+    )
+
+
+@pytest.fixture
+async def get_labtracks_async_session(labtracks_async_engine):
+    """Generate an async session to query lab_tracks data."""
+    async with AsyncSession(
+        labtracks_async_engine, expire_on_commit=False
+    ) as session:
+        yield session
+
+
+@pytest.fixture
+def async_client(client, labtracks_async_engine):
+    """Test client whose subject and task routes use the async session."""
+
+    async def override_get_async_session():
+        """Override the async session with one for tests."""
+        async with AsyncSession(
+            labtracks_async_engine, expire_on_commit=False
+        ) as session:
+            yield session
+
+    app.dependency_overrides[get_lb_async_session] = override_get_async_session
+    yield client
+    app.dependency_overrides.pop(get_lb_async_session)
+
+
 @pytest.fixture(scope="session")
 def client(get_labtracks_session):
     """Override a dependency required by the FastAPI app."""
@@ -153,3 +209,11 @@ def client(get_labtracks_session):
     with TestClient(app, raise_server_exceptions=False) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_caches():
+    """Start every test with empty response caches."""
+    for cache in get_caches().values():
+        cache.clear()
+    yield
@@ -0,0 +1,175 @@
+"""Tests cache module"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import fakeredis
+import pytest
+
+from aind_labtracks_service_server.cache import (
+    ResponseCache,
+    create_redis_client,
+)
+from aind_labtracks_service_server.models import CacheStats
+
+
+class TestResponseCache:
+    """Test methods in ResponseCache class"""
+
+    def test_get_or_set(self):
+        """Tests values are computed once and then served from the cache"""
+        cache = ResponseCache(ttl=60, max_entries=2)
+        func = MagicMock(return_value=["a"])
+        assert ["a"] == cache.get_or_set("k", func)
+        assert ["a"] == cache.get_or_set("k", func)
+        func.assert_called_once()
+        assert (
+            CacheStats(
+                hits=1, shared_hits=0, misses=1, size=1, max_entries=2, ttl=60
+            )
+            == cache.stats()
+        )
+
+    async def test_get_or_set_async(self):
+        """Tests values computed by a coroutine are cached"""
+        cache = ResponseCache(ttl=60, max_entries=2)
+        func = AsyncMock(return_value=b"[1]")
+        assert b"[1]" == await cache.get_or_set_async("k", func)
+        assert b"[1]" == await cache.get_or_set_async("k", func)
+        func.assert_awaited_once()
+        assert 1 == cache.stats().misses
+        disabled = ResponseCache(ttl=0, max_entries=2)
+        assert b"[1]" == await disabled.get_or_set_async("k", func)
+        assert 2 == func.await_count
+
+    def test_ttl_expiry(self):
+        """Tests expired entries are recomputed"""
+        cache = ResponseCache(ttl=10, max_entries=2)
+        func = MagicMock(side_effect=[1, 2])
+        with patch(
+            "aind_labtracks_service_server.cache.time.monotonic",
+            side_effect=[0, 0, 11, 11],
+        ):
+            assert 1 == cache.get_or_set("k", func)
+            assert 2 == cache.get_or_set("k", func)
+        assert 2 == cache.stats().misses
+
+    def test_lru_eviction(self):
+        """Tests the least recently used entry is evicted"""
+        cache = ResponseCache(ttl=60, max_entries=2)
+        cache.get_or_set("a", lambda: 1)
+        cache.get_or_set("b", lambda: 2)
+        cache.get_or_set("a", lambda: 1)
+        cache.get_or_set("c", lambda: 3)
+        assert 3 == cache.get_or_set("c", lambda: 0)
+        assert 1 == cache.get_or_set("a", lambda: 0)
+        assert 9 == cache.get_or_set("b", lambda: 9)
+        assert 2 == cache.stats().size
+
+    def test_disabled(self):
+        """Tests nothing is stored when the ttl is 0"""
+        cache = ResponseCache(ttl=0, max_entries=2)
+        func = MagicMock(return_value=1)
+        cache.get_or_set("k", func)
+        cache.get_or_set("k", func)
+        assert 2 == func.call_count
+        assert (
+            CacheStats(hits=0, misses=0, size=0, max_entries=2, ttl=0)
+            == cache.stats()
+        )
+
+    def test_clear(self):
+        """Tests entries and counters are reset"""
+        cache = ResponseCache(ttl=60, max_entries=2)
+        cache.get_or_set("k", lambda: 1)
+        cache.clear()
+        assert (
+            CacheStats(hits=0, misses=0, size=0, max_entries=2, ttl=60)
+            == cache.stats()
+        )
+
+
+class TestSharedResponseCache:
+    """Test ResponseCache with a Redis tier"""
+
+    def test_shared_hit(self):
+        """Tests a value computed by one replica is served to another"""
+        redis_client = fakeredis.FakeRedis()
+        replica_1 = ResponseCache(
+            ttl=60, max_entries=2, redis_client=redis_client, key_prefix="p:"
+        )
+        replica_2 = ResponseCache(
+            ttl=60, max_entries=2, redis_client=redis_client, key_prefix="p:"
+        )
+        assert b"[1]" == replica_1.get_or_set(1, lambda: b"[1]")
+        func = MagicMock(return_value=b"[2]")
+        assert b"[1]" == replica_2.get_or_set(1, func)
+        assert b"[1]" == replica_2.get_or_set(1, func)
+        func.assert_not_called()
+        assert 0 < redis_client.pttl("p:1") <= 60000
+        assert (
+            CacheStats(
+                hits=1, shared_hits=1, misses=0, size=1, max_entries=2, ttl=60
+            )
+            == replica_2.stats()
+        )
+
+    def test_shared_hit_keeps_remaining_ttl(self):
+        """Tests a value from Redis expires locally when it does in Redis"""
+        redis_client = fakeredis.FakeRedis()
+        redis_client.set("p:1", b"[1]", px=5000)
+        cache = ResponseCache(
+            ttl=60, max_entries=2, redis_client=redis_client, key_prefix="p:"
+        )
+        with patch("time.monotonic", return_value=100.0):
+            assert b"[1]" == cache.get_or_set(1, lambda: b"[2]")
+        assert 100.0 < cache._entries[1][0] <= 105.0
+        with patch("time.monotonic", return_value=106.0):
+            redis_client.delete("p:1")
+            assert b"[2]" == cache.get_or_set(1, lambda: b"[2]")
+
+    def test_shared_hit_without_expiry(self):
+        """Tests a value without an expiry in Redis uses the cache ttl"""
+        redis_client = fakeredis.FakeRedis()
+        redis_client.set("1", b"[1]")
+        cache = ResponseCache(ttl=60, max_entries=2, redis_client=redis_client)
+        with patch("time.monotonic", return_value=100.0):
+            assert b"[1]" == cache.get_or_set(1, lambda: b"[2]")
+        assert 160.0 == cache._entries[1][0]
+
+    async def test_shared_hit_async(self):
+        """Tests coroutine values are shared through Redis"""
+        redis_client = fakeredis.FakeRedis()
+        replica_1 = ResponseCache(
+            ttl=60, max_entries=2, redis_client=redis_client
+        )
+        replica_2 = ResponseCache(
+            ttl=60, max_entries=2, redis_client=redis_client
+        )
+        func = AsyncMock(return_value=b"[1]")
+        assert b"[1]" == await replica_1.get_or_set_async(1, func)
+        assert b"[1]" == await replica_2.get_or_set_async(1, func)
+        func.assert_awaited_once()
+        assert 1 == replica_2.stats().shared_hits
+
+    def test_redis_errors(self):
+        """Tests Redis errors are logged and the value is computed"""
+        redis_client = MagicMock()
+        redis_client.pipeline.return_value.execute.side_effect = (
+            ConnectionError("Redis is down")
+        )
+        redis_client.set.side_effect = ConnectionError("Redis is down")
+        cache = ResponseCache(ttl=60, max_entries=2, redis_client=redis_client)
+        with patch("logging.warning") as mock_warn:
+            assert b"[1]" == cache.get_or_set(1, lambda: b"[1]")
+        assert 2 == mock_warn.call_count
+        assert 1 == cache.stats().misses
+
+    def test_create_redis_client(self):
+        """Tests a client is created from a url"""
+        redis_client = create_redis_client("redis://localhost:6379/1")
+        assert 1 == redis_client.connection_pool.connection_kwargs["db"]
+        redis_client.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
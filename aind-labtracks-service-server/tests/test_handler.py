@@ -1,8 +1,19 @@
 """Tests for handler module"""
 
+import logging
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
 import pytest
 
-from aind_labtracks_service_server.handler import SessionHandler
+from aind_labtracks_service_server.handler import (
+    AsyncSessionHandler,
+    SessionHandler,
+    _subject_view_fields_statement,
+    _task_view_variant_statement,
+)
+from aind_labtracks_service_server.models import ChangeFeed, TaskFilters
+from aind_labtracks_service_server.session import get_settings
 
 
 class TestHandler:
@@ -21,12 +32,299 @@ class TestHandler:
         subject = session_handler.get_subject_view(subject_id="632269")
         assert test_labtracks_subject == subject[0]
 
+    def test_get_subject_view_fields(
+        self, get_labtracks_session, test_labtracks_subject
+    ):
+        """Tests only the requested subject fields are selected."""
+        session_handler = SessionHandler(get_labtracks_session)
+        subject = session_handler.get_subject_view(
+            subject_id="632269", fields=("sex", "birth_date")
+        )[0]
+        assert test_labtracks_subject.id == subject.id
+        assert test_labtracks_subject.sex == subject.sex
+        assert test_labtracks_subject.birth_date == subject.birth_date
+        assert subject.class_values is None
+        assert subject.species_name is None
+        subject = session_handler.get_subject_view(
+            subject_id="632269", fields=("group_description",)
+        )[0]
+        assert (
+            test_labtracks_subject.group_description
+            == subject.group_description
+        )
+
+    def test_subject_view_fields_statement_joins(self):
+        """Tests joins are only added for the requested fields."""
+        sql = str(_subject_view_fields_statement(("sex", "birth_date")))
+        assert "JOIN" not in sql
+        sql = str(_subject_view_fields_statement(("group_description",)))
+        assert "JOIN" in sql
+        assert " m " in sql and " gm " in sql
+        assert " s " not in sql and " g " not in sql
+
+    def test_task_view_variant_statement_fields(self):
+        """Tests task fields are pruned but inner joins are kept."""
+        statement = _task_view_variant_statement(
+            filter_names=("type_name",),
+            ordered=False,
+            has_after=False,
+            fields=("date_start",),
+        )
+        assert ["id", "date_start"] == [
+            c.key for c in statement.selected_columns
+        ]
+        assert 4 == str(statement).count("JOIN")
+
     def test_get_task_value(self, get_labtracks_session, test_labtracks_task):
         """Tests task view is returned correctly."""
         session_handler = SessionHandler(get_labtracks_session)
         tasks = session_handler.get_task_view(subject_id="632269")
         assert test_labtracks_task == tasks[0]
 
+    def test_get_task_view_paginated(self, get_labtracks_session):
+        """Tests tasks are returned one page at a time."""
+        session_handler = SessionHandler(get_labtracks_session)
+        first_page = session_handler.get_task_view(
+            subject_id="615310", limit=2
+        )
+        second_page = session_handler.get_task_view(
+            subject_id="615310", limit=2, after=2100002
+        )
+        remaining = session_handler.get_task_view(
+            subject_id="615310", after=2100001
+        )
+        assert [2100001, 2100002] == [int(t.id) for t in first_page]
+        assert [2100003] == [int(t.id) for t in second_page]
+        assert [2100002, 2100003] == [int(t.id) for t in remaining]
+
+    def test_get_task_view_filtered(self, get_labtracks_session):
+        """Tests tasks are filtered in the database."""
+        session_handler = SessionHandler(get_labtracks_session)
+        surgeries = session_handler.get_task_view(
+            subject_id="615310", filters=TaskFilters(type_name="Surgery")
+        )
+        finished_surgeries = session_handler.get_task_view(
+            subject_id="615310",
+            filters=TaskFilters(type_name="Surgery", task_status="F"),
+        )
+        date_range = session_handler.get_task_view(
+            subject_id="615310",
+            filters=TaskFilters(
+                date_start_from=datetime(2021, 1, 5, 9),
+                date_start_to=datetime(2021, 3, 10, 9),
+            ),
+        )
+        paged = session_handler.get_task_view(
+            subject_id="615310",
+            limit=1,
+            after=2100002,
+            filters=TaskFilters(type_name="Surgery"),
+        )
+        assert {2100002, 2100003} == {int(t.id) for t in surgeries}
+        assert [2100002] == [int(t.id) for t in finished_surgeries]
+        assert {2100001, 2100002} == {int(t.id) for t in date_range}
+        assert [2100003] == [int(t.id) for t in paged]
+
+    def test_iter_task_view(self, get_labtracks_session, test_labtracks_task):
+        """Tests task view is streamed correctly."""
+        session_handler = SessionHandler(get_labtracks_session)
+        tasks = session_handler.iter_task_view(
+            subject_id="632269", batch_size=1
+        )
+        assert [test_labtracks_task] == list(tasks)
+        tasks = session_handler.iter_task_view(
+            subject_id="615310", limit=1, after=2100001
+        )
+        assert [2100002] == [int(t.id) for t in tasks]
+        tasks = session_handler.iter_task_view(
+            subject_id="632269", fields=("type_name",)
+        )
+        assert [
+            (test_labtracks_task.id, test_labtracks_task.type_name, None)
+        ] == [(t.id, t.type_name, t.date_start) for t in tasks]
+
+    def test_get_subject_views(
+        self, get_labtracks_session, test_labtracks_subject
+    ):
+        """Tests subject views are returned grouped by subject id."""
+        session_handler = SessionHandler(get_labtracks_session)
+        subjects = session_handler.get_subject_views(
+            subject_ids=["632269", 623236, "632269", "1"]
+        )
+        assert [632269, 623236, 1] == list(subjects.keys())
+        assert [test_labtracks_subject] == subjects[632269]
+        assert 1 == len(subjects[623236])
+        assert [] == subjects[1]
+
+    def test_slow_view_logged_with_row_count(
+        self, get_labtracks_session, caplog
+    ):
+        """Tests slow view queries are logged with their row count."""
+        session_handler = SessionHandler(get_labtracks_session)
+        with caplog.at_level(logging.WARNING):
+            session_handler.get_subject_views(subject_ids=[632269, 623236])
+            assert "Slow subject_views" not in caplog.text
+            with patch.object(get_settings(), "slow_query_threshold", -1):
+                session_handler.get_subject_views(subject_ids=[632269, 623236])
+        assert "Slow subject_views query took" in caplog.text
+        assert "returned 2 rows" in caplog.text
+
+    def test_get_subject_views_chunked(
+        self, get_labtracks_session, test_labtracks_subject
+    ):
+        """Tests ids are split into several IN clause queries."""
+        session_handler = SessionHandler(get_labtracks_session)
+        with (
+            patch(
+                "aind_labtracks_service_server.handler.MAX_IN_CLAUSE_SIZE", 2
+            ),
+            patch.object(
+                get_labtracks_session,
+                "execute",
+                wraps=get_labtracks_session.execute,
+            ) as mock_execute,
+        ):
+            subjects = session_handler.get_subject_views(
+                subject_ids=["632269", "623236", "615310"]
+            )
+        assert 2 == mock_execute.call_count
+        assert [test_labtracks_subject] == subjects[632269]
+        assert 1 == len(subjects[615310])
+
+    def test_get_task_views(self, get_labtracks_session, test_labtracks_task):
+        """Tests task views are returned grouped by subject id."""
+        session_handler = SessionHandler(get_labtracks_session)
+        with (
+            patch(
+                "aind_labtracks_service_server.handler.MAX_IN_CLAUSE_SIZE", 1
+            ),
+            patch.object(
+                get_labtracks_session,
+                "execute",
+                wraps=get_labtracks_session.execute,
+            ) as mock_execute,
+        ):
+            tasks = session_handler.get_task_views(
+                subject_ids=["632269", 623236]
+            )
+        assert 2 == mock_execute.call_count
+        assert {632269: [test_labtracks_task], 623236: []} == tasks
+
+    def test_get_modified_subject_ids(self, get_labtracks_session):
+        """Tests subjects are found by row_modified."""
+        session_handler = SessionHandler(get_labtracks_session)
+        assert [
+            615310,
+            623236,
+            632269,
+        ] == session_handler.get_modified_subject_ids()
+        # Subject 632269 is in a group modified in 2024
+        assert [632269] == session_handler.get_modified_subject_ids(
+            since=datetime(2024, 1, 1)
+        )
+        assert [] == session_handler.get_modified_subject_ids(
+            since=datetime(2025, 1, 1)
+        )
+
+    def test_get_modified_task_subject_ids(self, get_labtracks_session):
+        """Tests subjects with modified tasks are found by row_modified."""
+        session_handler = SessionHandler(get_labtracks_session)
+        assert [
+            615310,
+            632269,
+        ] == session_handler.get_modified_task_subject_ids()
+        # The tasks of both subjects use a protocol modified in 2025
+        assert [
+            615310,
+            632269,
+        ] == session_handler.get_modified_task_subject_ids(
+            since=datetime(2025, 1, 1)
+        )
+        assert [] == session_handler.get_modified_task_subject_ids(
+            since=datetime(2025, 3, 1)
+        )
+
+    def test_get_row_modified_watermark(self, get_labtracks_session):
+        """Tests the latest row_modified timestamp is returned."""
+        session_handler = SessionHandler(get_labtracks_session)
+        assert (
+            datetime(2025, 2, 28, 12, 8, 5, 173000)
+            == session_handler.get_row_modified_watermark()
+        )
+
+    def test_get_changes(self, get_labtracks_session, test_labtracks_task):
+        """Tests changes are returned with and without views."""
+        session_handler = SessionHandler(get_labtracks_session)
+        since = datetime(2025, 1, 1)
+        changes = session_handler.get_changes(since=since)
+        assert (
+            ChangeFeed(
+                since=since,
+                watermark=datetime(2025, 2, 28, 12, 8, 5, 173000),
+                subject_ids=[],
+                task_subject_ids=[615310, 632269],
+            )
+            == changes
+        )
+        changes = session_handler.get_changes(since=since, include_views=True)
+        assert {} == changes.subjects
+        assert [test_labtracks_task] == changes.tasks[632269]
+        assert 3 == len(changes.tasks[615310])
+
+    def test_get_changes_overlap(self, get_labtracks_session):
+        """Tests changes within the overlap before since are returned."""
+        session_handler = SessionHandler(get_labtracks_session)
+        since = datetime(2025, 2, 28, 12, 9)
+        changes = session_handler.get_changes(since=since)
+        assert [] == changes.task_subject_ids
+        changes = session_handler.get_changes(
+            since=since, overlap=timedelta(seconds=60)
+        )
+        assert since == changes.since
+        assert [615310, 632269] == changes.task_subject_ids
+
+
+class TestAsyncHandler:
+    """Test AsyncSessionHandler"""
+
+    async def test_get_subject_view(
+        self, get_labtracks_async_session, test_labtracks_subject
+    ):
+        """Tests subject view is returned correctly."""
+        session_handler = AsyncSessionHandler(get_labtracks_async_session)
+        subject = await session_handler.get_subject_view(subject_id="632269")
+        assert [test_labtracks_subject] == subject
+        subject = await session_handler.get_subject_view(
+            subject_id="632269", fields=("id", "sex")
+        )
+        assert [("F", None)] == [(s.sex, s.birth_date) for s in subject]
+
+    async def test_get_task_view(
+        self, get_labtracks_async_session, test_labtracks_task
+    ):
+        """Tests task view is returned correctly."""
+        session_handler = AsyncSessionHandler(get_labtracks_async_session)
+        tasks = await session_handler.get_task_view(subject_id="632269")
+        assert [test_labtracks_task] == tasks
+        tasks = await session_handler.get_task_view(
+            subject_id="615310",
+            limit=2,
+            filters=TaskFilters(task_status="F"),
+        )
+        assert 2 == len(tasks)
+        assert tasks[0].id < tasks[1].id
+
+    async def test_slow_view_logged(self, get_labtracks_async_session, caplog):
+        """Tests slow async view queries are logged with their row count."""
+        session_handler = AsyncSessionHandler(get_labtracks_async_session)
+        with (
+            caplog.at_level(logging.WARNING),
+            patch.object(get_settings(), "slow_query_threshold", -1),
+        ):
+            await session_handler.get_subject_view(subject_id="632269")
+        assert "Slow subject_view query took" in caplog.text
+        assert "returned 1 rows" in caplog.text
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,7 +1,13 @@
 """Module to test main app"""
 
+import logging
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 
+from aind_labtracks_service_server.main import app, lifespan
+from aind_labtracks_service_server.session import get_settings
+
 
 class TestMain:
     """Tests app endpoints"""
@@ -16,11 +22,157 @@ class TestMain:
         response = client.get("/subject/632269")
         assert 200 == response.status_code
 
+    def test_get_subjects(self, client, get_labtracks_session):
+        """Tests bulk subjects"""
+        response = client.get("/subjects", params={"subject_ids": "632269"})
+        assert 200 == response.status_code
+
+    def test_post_subjects(self, client, get_labtracks_session):
+        """Tests bulk subjects posted as a json list"""
+        response = client.post("/subjects", json=["632269"])
+        assert 200 == response.status_code
+
     def test_get_tasks(self, client, get_labtracks_session):
         """Tests tasks"""
         response = client.get("/tasks/632269")
         assert 200 == response.status_code
 
+    def test_get_tasks_for_subjects(self, client, get_labtracks_session):
+        """Tests bulk tasks"""
+        response = client.get("/tasks", params={"subject_ids": "632269"})
+        assert 200 == response.status_code
+
+    def test_post_tasks_for_subjects(self, client, get_labtracks_session):
+        """Tests bulk tasks posted as a json list"""
+        response = client.post("/tasks", json=["632269"])
+        assert 200 == response.status_code
+
+    def test_get_changes(self, client, get_labtracks_session):
+        """Tests change feed"""
+        response = client.get("/changes", params={"since": "2024-01-01"})
+        assert 200 == response.status_code
+
+    def test_gzip_middleware(self, client):
+        """Tests large responses are compressed for clients that accept it"""
+        response = client.get(
+            "/openapi.json", headers={"Accept-Encoding": "gzip"}
+        )
+        assert "gzip" == response.headers["content-encoding"]
+        response = client.get(
+            "/healthcheck", headers={"Accept-Encoding": "gzip"}
+        )
+        assert "content-encoding" not in response.headers
+
+    def test_openapi_response_models(self):
+        """Tests response models are documented for pre-serialized routes"""
+        paths = app.openapi()["paths"]
+
+        def schema(path):
+            """Schema of the json response of a path."""
+            content = paths[path]["get"]["responses"]["200"]["content"]
+            return content["application/json"]["schema"]
+
+        assert "#/components/schemas/Subject" == (
+            schema("/subjects")["additionalProperties"]["items"]["$ref"]
+        )
+        assert "#/components/schemas/Task" == (
+            schema("/tasks")["additionalProperties"]["items"]["$ref"]
+        )
+        assert "#/components/schemas/ChangeFeed" == schema("/changes")["$ref"]
+
+
+class TestProfiling:
+    """Tests requests can be profiled"""
+
+    def test_profile_request(self, client, get_labtracks_session, caplog):
+        """Tests a profile is logged for requests with the debug header"""
+        with (
+            caplog.at_level(logging.INFO),
+            patch.object(get_settings(), "profiling_enabled", True),
+        ):
+            client.get("/subject/632269")
+            assert "Profile for" not in caplog.text
+            response = client.get(
+                "/subject/632269", headers={"X-Debug-Profile": "1"}
+            )
+        assert 200 == response.status_code
+        assert "Profile for GET /subject/632269" in caplog.text
+        assert "(_get_subject_sync)" in caplog.text
+
+    def test_profiling_disabled(self, client, get_labtracks_session, caplog):
+        """Tests the debug header is ignored unless profiling is enabled"""
+        with caplog.at_level(logging.INFO):
+            client.get("/healthcheck", headers={"X-Debug-Profile": "1"})
+        assert "Profile for" not in caplog.text
+
+
+class TestLifespan:
+    """Tests app startup and shutdown"""
+
+    async def test_lifespan(self):
+        """Tests the engine is disposed and no async engine is created"""
+        with (
+            patch(
+                "aind_labtracks_service_server.main.get_engine"
+            ) as mock_get_engine,
+            patch(
+                "aind_labtracks_service_server.main.get_async_engine"
+            ) as mock_get_async_engine,
+        ):
+            async with lifespan(app):
+                pass
+        mock_get_engine.return_value.dispose.assert_called_once()
+        mock_get_async_engine.assert_not_called()
+
+    async def test_lifespan_async_queries(self):
+        """Tests the async engine is created and disposed when enabled"""
+        with (
+            patch.object(get_settings(), "async_queries", True),
+            patch(
+                "aind_labtracks_service_server.main.get_async_engine",
+                return_value=MagicMock(dispose=AsyncMock()),
+            ) as mock_get_async_engine,
+        ):
+            async with lifespan(app):
+                mock_get_async_engine.assert_called_once()
+        mock_get_async_engine.return_value.dispose.assert_awaited_once()
+
+    async def test_lifespan_bad_cache_config(self):
+        """Tests a broken cache configuration fails at startup"""
+        with (
+            patch(
+                "aind_labtracks_service_server.main.get_caches",
+                side_effect=ModuleNotFoundError("No module named 'redis'"),
+            ),
+            pytest.raises(ModuleNotFoundError),
+        ):
+            async with lifespan(app):
+                pass  # pragma: no cover
+
+    async def test_lifespan_prewarm(self):
+        """Tests pooled connections are opened up to the pool size"""
+        with (
+            patch.object(get_settings(), "pool_prewarm_connections", 8),
+            patch(
+                "aind_labtracks_service_server.main.prewarm_engine"
+            ) as mock_prewarm,
+        ):
+            async with lifespan(app):
+                mock_prewarm.assert_called_once()
+        assert 5 == mock_prewarm.call_args.args[1]
+
+    async def test_lifespan_materialized_views(self):
+        """Tests materialized views are refreshed while the app runs"""
+        with (
+            patch.object(get_settings(), "materialize_views", True),
+            patch(
+                "aind_labtracks_service_server.main.get_materialized_views"
+            ) as mock_get_views,
+        ):
+            async with lifespan(app):
+                mock_get_views.return_value.start.assert_called_once()
+            mock_get_views.return_value.stop.assert_called_once()
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,136 @@
+"""Tests materialized module"""
+
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from aind_labtracks_service_server.materialized import MaterializedViews
+
+
+class TestMaterializedViews:
+    """Test methods in MaterializedViews class"""
+
+    def test_refresh(
+        self,
+        get_labtracks_session,
+        test_labtracks_subject,
+        test_labtracks_task,
+    ):
+        """Tests the first refresh loads every subject and task"""
+        views = MaterializedViews(max_staleness=60)
+        assert views.get_subject_view(632269) is None
+        views.refresh(get_labtracks_session)
+        assert views.is_fresh
+        assert datetime(2025, 2, 28, 12, 8, 5, 173000) == views.watermark
+        assert [test_labtracks_subject] == views.get_subject_view(632269)
+        assert [test_labtracks_task] == views.get_task_view(632269)
+        assert 3 == len(views.get_task_view(615310))
+        assert [] == views.get_subject_view(1234)
+        assert [] == views.get_task_view(623236)
+
+    def test_incremental_refresh(self, get_labtracks_session):
+        """Tests later refreshes only reload modified subjects"""
+        views = MaterializedViews(max_staleness=60)
+        views.refresh(get_labtracks_session)
+        views.watermark = datetime(2024, 1, 1)
+        with patch(
+            "aind_labtracks_service_server.handler.SessionHandler"
+            ".get_subject_views",
+            return_value={},
+        ) as mock_get_subjects:
+            views.refresh(get_labtracks_session)
+        mock_get_subjects.assert_called_once_with([632269])
+
+    def test_refresh_removes_missing_subjects(self, get_labtracks_session):
+        """Tests subjects that no longer have a view are dropped"""
+        views = MaterializedViews(max_staleness=60)
+        views.refresh(get_labtracks_session)
+        views.watermark = datetime(2024, 1, 1)
+        with patch(
+            "aind_labtracks_service_server.handler.SessionHandler"
+            ".get_subject_views",
+            return_value={632269: []},
+        ):
+            views.refresh(get_labtracks_session)
+        assert [] == views.get_subject_view(632269)
+        assert 1 == len(views.get_subject_view(615310))
+
+    def test_incremental_refresh_overlap(self, get_labtracks_session):
+        """Tests changes just before the watermark are loaded again"""
+        views = MaterializedViews(max_staleness=60, overlap=60)
+        views.refresh(get_labtracks_session)
+        views.watermark = datetime(2025, 2, 28, 12, 9)
+        with patch(
+            "aind_labtracks_service_server.handler.SessionHandler"
+            ".get_task_views",
+            return_value={},
+        ) as mock_get_tasks:
+            views.refresh(get_labtracks_session)
+        mock_get_tasks.assert_called_once_with([615310, 632269])
+
+    def test_full_refresh(self, get_labtracks_session, test_labtracks_task):
+        """Tests views of deleted rows are dropped by a full refresh"""
+        views = MaterializedViews(max_staleness=60, full_refresh_interval=30)
+        with patch(
+            "aind_labtracks_service_server.materialized.time.monotonic",
+            side_effect=[0, 10, 40, 40],
+        ):
+            views.refresh(get_labtracks_session)
+            views._tasks[632269] = [test_labtracks_task] * 2
+            views.refresh(get_labtracks_session)
+            assert 2 == len(views._tasks[632269])
+            views.refresh(get_labtracks_session)
+            assert [test_labtracks_task] == views.get_task_view(632269)
+        assert 40 == views.full_refreshed_at
+
+    def test_staleness(self, get_labtracks_session):
+        """Tests reads stop once the copy is older than max_staleness"""
+        views = MaterializedViews(max_staleness=10)
+        with patch(
+            "aind_labtracks_service_server.materialized.time.monotonic",
+            side_effect=[0, 5, 11, 11],
+        ):
+            views.refresh(get_labtracks_session)
+            assert views.get_subject_view(632269) is not None
+            assert views.get_subject_view(632269) is None
+            assert views.get_task_view(632269) is None
+
+    def test_start_and_stop(self):
+        """Tests the copy is refreshed in a background thread"""
+        views = MaterializedViews(max_staleness=60)
+        refreshed = threading.Event()
+        session_factory = MagicMock()
+        with patch.object(
+            views, "refresh", side_effect=lambda _: refreshed.set()
+        ):
+            views.start(session_factory, interval=60)
+            assert refreshed.wait(timeout=5)
+            views.stop()
+        assert views._thread is None
+        session_factory.assert_called_once()
+        views.stop()
+
+    def test_failed_refresh_is_logged(self, caplog):
+        """Tests errors in the background refresh are logged"""
+        views = MaterializedViews(max_staleness=60)
+        failed = threading.Event()
+
+        def refresh(_):
+            """Fail and signal the test."""
+            failed.set()
+            raise Exception("Something went wrong")
+
+        with patch.object(views, "refresh", side_effect=refresh):
+            views.start(MagicMock(), interval=60)
+            assert failed.wait(timeout=5)
+            views.stop()
+        assert (
+            "Materialized view refresh failed: Something went wrong"
+            in caplog.text
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,103 @@
+"""Tests metrics module"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from aind_labtracks_service_server.cache import ResponseCache
+from aind_labtracks_service_server.metrics import (
+    RequestDurationMiddleware,
+    ServiceCollector,
+)
+
+
+class TestServiceCollector:
+    """Test methods in ServiceCollector class"""
+
+    def test_collect(self):
+        """Tests cache counters and pool usage are reported"""
+        cache = ResponseCache(ttl=60, max_entries=2)
+        cache.get_or_set("a", lambda: b"1")
+        cache.get_or_set("a", lambda: b"1")
+        cache.get_or_set("b", lambda: b"2")
+        pool = MagicMock()
+        pool.size.return_value = 5
+        pool.checkedin.return_value = 2
+        pool.checkedout.return_value = 3
+        pool.overflow.return_value = -2
+        registry = CollectorRegistry()
+        registry.register(
+            ServiceCollector(
+                get_caches=lambda: {
+                    "subject": cache,
+                    "empty": ResponseCache(0, 0),
+                },
+                get_pool=lambda: pool,
+            )
+        )
+
+        def value(name, **labels):
+            """Read a sample from the registry."""
+            return registry.get_sample_value(name, labels)
+
+        assert 1 == value(
+            "labtracks_cache_lookups_total", cache="subject", result="hit"
+        )
+        assert 2 == value(
+            "labtracks_cache_lookups_total", cache="subject", result="miss"
+        )
+        assert pytest.approx(1 / 3) == value(
+            "labtracks_cache_hit_ratio", cache="subject"
+        )
+        assert 0 == value("labtracks_cache_hit_ratio", cache="empty")
+        assert 2 == value("labtracks_cache_entries", cache="subject")
+        assert 3 == value("labtracks_pool_connections", state="checked_out")
+        assert 5 == value("labtracks_pool_size")
+
+    def test_describe(self):
+        """Tests the metrics are described without reading the caches"""
+        collector = ServiceCollector(
+            get_caches=MagicMock(), get_pool=MagicMock()
+        )
+        registry = CollectorRegistry()
+        registry.register(collector)
+        assert 5 == len(list(collector.describe()))
+        collector.get_caches.assert_not_called()
+        collector.get_pool.assert_not_called()
+
+
+class TestRequestDurationMiddleware:
+    """Test RequestDurationMiddleware"""
+
+    async def test_stream_timed_until_last_body(self):
+        """Tests a streamed response is timed until its last body message"""
+        observed = []
+
+        async def app(scope, receive, send):
+            """Stream two chunks of a response."""
+            await send({"type": "http.response.start", "status": 200})
+            await send({"type": "http.response.body", "more_body": True})
+            assert [] == observed
+            await send({"type": "http.response.body", "more_body": False})
+
+        async def send(message):
+            """Discard the message."""
+
+        scope = {"type": "http", "method": "GET", "route": MagicMock()}
+        scope["route"].path = "/tasks/{subject_id}"
+        with patch(
+            "aind_labtracks_service_server.metrics.REQUEST_DURATION"
+        ) as mock_duration:
+            mock_duration.labels.return_value.observe.side_effect = (
+                observed.append
+            )
+            await RequestDurationMiddleware(app)(scope, None, send)
+        mock_duration.labels.assert_called_once_with(
+            method="GET", route="/tasks/{subject_id}", status=200
+        )
+        assert 1 == len(observed)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
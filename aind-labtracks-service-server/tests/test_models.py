@@ -4,12 +4,15 @@ import unittest
 from unittest.mock import MagicMock, patch
 
 from pydantic import ValidationError
+from pydantic_xml import ParsingError
 
 from aind_labtracks_service_server.models import (
     MouseCustomClass,
     SexNames,
     SpeciesNames,
     Subject,
+    _fast_parse_mouse_custom_class,
+    parse_mouse_custom_class,
 )
 
 
@@ -128,5 +131,68 @@ class TestSubject(unittest.TestCase):
         self.assertEqual(Subject(id=123456), lab_tracks_subject)
 
 
+class TestParseMouseCustomClass(unittest.TestCase):
+    """Test fast and memoized parsing of MouseCustomClass xml strings"""
+
+    xml_string = (
+        '<?xml version="1.0" encoding="utf-16"?>\r\n'
+        "<MouseCustomClass"
+        ' xmlns:xsd="http://www.w3.org/2001/XMLSchema"'
+        ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\r\n'
+        "  <Reserved_by></Reserved_by>\r\n"
+        "  <Reserve_Date>2022-07-21T00:00:00-07:00</Reserve_Date>\r\n"
+        "  <Reason>EU-Retire</Reason>\r\n"
+        "  <Solution>1xPBS</Solution>\r\n"
+        "  <Full_Genotype>Adora2a-Cre/wt</Full_Genotype>\r\n"
+        "  <Phenotype>P19: TSTW. </Phenotype>\r\n"
+        "  <ExtraField>test</ExtraField>\r\n"
+        "</MouseCustomClass>"
+    )
+
+    def test_fast_parse_matches_pydantic_xml(self):
+        """Tests the fast parser returns the same model as pydantic-xml"""
+        self.assertEqual(
+            MouseCustomClass.from_xml(self.xml_string),
+            _fast_parse_mouse_custom_class(self.xml_string),
+        )
+
+    def test_fast_parse_unexpected_shapes(self):
+        """Tests the fast parser declines shapes it does not handle"""
+        self.assertIsNone(
+            _fast_parse_mouse_custom_class("<Other><Reason>a</Reason></Other>")
+        )
+        self.assertIsNone(
+            _fast_parse_mouse_custom_class(
+                "<MouseCustomClass><Reason>a<b/></Reason></MouseCustomClass>"
+            )
+        )
+        self.assertIsNone(
+            _fast_parse_mouse_custom_class(
+                "<MouseCustomClass><Reason>a</Reason><Reason>b</Reason>"
+                "</MouseCustomClass>"
+            )
+        )
+
+    def test_parse_falls_back_to_pydantic_xml(self):
+        """Tests unexpected shapes are parsed with pydantic-xml"""
+        xml_string = (
+            "<MouseCustomClass><Reason>a</Reason><Reason>b</Reason>"
+            "</MouseCustomClass>"
+        )
+        self.assertEqual(
+            MouseCustomClass(reason="a"), parse_mouse_custom_class(xml_string)
+        )
+        with self.assertRaises(ParsingError):
+            parse_mouse_custom_class("<Other></Other>")
+
+    def test_parse_memoized(self):
+        """Tests repeated strings are only parsed once"""
+        parse_mouse_custom_class.cache_clear()
+        first = parse_mouse_custom_class(self.xml_string)
+        second = parse_mouse_custom_class(self.xml_string)
+        self.assertIs(first, second)
+        self.assertEqual(1, parse_mouse_custom_class.cache_info().hits)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,48 @@
+"""Tests profiling module"""
+
+import cProfile
+
+import pytest
+
+from aind_labtracks_service_server.profiling import (
+    ProfiledRoute,
+    current_profiler,
+    format_profile,
+)
+
+
+class TestProfiledRoute:
+    """Test methods in ProfiledRoute class"""
+
+    def test_sync_endpoint_profiled(self):
+        """Tests sync endpoints run under the current profiler"""
+
+        def get_item(item_id: int) -> int:
+            """Sample endpoint"""
+            return item_id
+
+        route = ProfiledRoute("/items/{item_id}", get_item)
+        assert "get_item" == route.name
+        assert 1 == route.endpoint(1)
+        profiler = cProfile.Profile()
+        token = current_profiler.set(profiler)
+        try:
+            assert 2 == route.endpoint(2)
+        finally:
+            current_profiler.reset(token)
+        assert "get_item" in format_profile(profiler)
+
+    async def test_async_endpoint_not_wrapped(self):
+        """Tests async endpoints are left as they are"""
+
+        async def get_item(item_id: int) -> int:
+            """Sample endpoint"""
+            return item_id
+
+        route = ProfiledRoute("/items/{item_id}", get_item)
+        assert get_item is route.endpoint
+        assert 3 == await route.endpoint(3)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
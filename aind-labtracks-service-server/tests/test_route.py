@@ -1,9 +1,14 @@
 """Test routes"""
 
+import json
+from decimal import Decimal
 from unittest.mock import patch
 
 import pytest
 
+from aind_labtracks_service_server.route import get_caches
+from aind_labtracks_service_server.session import get_settings
+
 
 class TestHealthcheckRoute:
     """Test healthcheck responses."""
@@ -15,6 +20,82 @@ class TestHealthcheckRoute:
         assert "OK" == response.json()["status"]
 
 
+class TestPoolStatusRoute:
+    """Test pool diagnostics responses."""
+
+    def test_get_pool_status(self, client):
+        """Tests a good response"""
+        response = client.get("/diagnostics/pool")
+        assert 200 == response.status_code
+        assert {
+            "size": 5,
+            "checked_in": 0,
+            "checked_out": 0,
+            "overflow": -5,
+        } == response.json()
+
+
+class TestCacheStatsRoute:
+    """Test cache diagnostics responses."""
+
+    def test_get_cache_stats(self, client, get_labtracks_session):
+        """Tests cache counters are reported"""
+        client.get("/subject/632269")
+        client.get("/subject/632269")
+        response = client.get("/diagnostics/cache")
+        assert 200 == response.status_code
+        assert {
+            "subject": {
+                "hits": 1,
+                "shared_hits": 0,
+                "misses": 1,
+                "size": 1,
+                "max_entries": 1024,
+                "ttl": 300.0,
+            },
+            "tasks": {
+                "hits": 0,
+                "shared_hits": 0,
+                "misses": 0,
+                "size": 0,
+                "max_entries": 1024,
+                "ttl": 300.0,
+            },
+            "gzip": {
+                "hits": 1,
+                "shared_hits": 0,
+                "misses": 1,
+                "size": 1,
+                "max_entries": 2048,
+                "ttl": 300.0,
+            },
+        } == response.json()
+
+
+class TestMetricsRoute:
+    """Test metrics responses."""
+
+    def test_get_metrics(self, client, get_labtracks_session):
+        """Tests request, query and cache metrics are reported"""
+        client.get("/subject/632269")
+        client.get("/not-a-route")
+        response = client.get("/metrics")
+        assert 200 == response.status_code
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'labtracks_request_duration_seconds_count{method="GET",'
+            'route="/subject/{subject_id}",status="200"}'
+        ) in response.text
+        assert 'route="unmatched",status="404"' in response.text
+        assert (
+            'labtracks_query_duration_seconds_count{query="subject_view"}'
+            in response.text
+        )
+        assert "labtracks_xml_parse_duration_seconds_count" in response.text
+        assert 'labtracks_cache_hit_ratio{cache="subject"}' in response.text
+        assert "labtracks_pool_size" in response.text
+
+
 class TestSubjectRoute:
     """Test subject responses."""
 
@@ -28,6 +109,68 @@ class TestSubjectRoute:
             test_labtracks_subject.model_dump(mode="json")
         ] == response.json()
 
+    def test_get_200_subject_fields(
+        self, client, get_labtracks_session, test_labtracks_subject
+    ):
+        """Tests only the requested fields are returned"""
+        response = client.get(
+            "/subject/632269", params={"fields": "birth_date, sex"}
+        )
+        assert 200 == response.status_code
+        assert [
+            test_labtracks_subject.model_dump(
+                mode="json", include={"id", "sex", "birth_date"}
+            )
+        ] == response.json()
+        response = client.get("/subject/632269")
+        assert [
+            test_labtracks_subject.model_dump(mode="json")
+        ] == response.json()
+
+    def test_422_unknown_subject_fields(self, client):
+        """Tests unknown field names are rejected"""
+        response = client.get(
+            "/subject/632269", params={"fields": "sex,color"}
+        )
+        assert 422 == response.status_code
+        assert "Unknown fields: color" == response.json()["detail"]
+
+    def test_get_200_subject_cached(
+        self, client, get_labtracks_session, test_labtracks_subject
+    ):
+        """Tests a repeated request is served from the cache"""
+        with patch(
+            "aind_labtracks_service_server.handler.SessionHandler"
+            ".get_subject_view",
+            return_value=[test_labtracks_subject],
+        ) as mock_get:
+            client.get("/subject/632269")
+            response = client.get("/subject/632269")
+        assert 200 == response.status_code
+        mock_get.assert_called_once()
+
+    def test_get_200_subject_materialized(
+        self, client, test_labtracks_subject
+    ):
+        """Tests a fresh materialized copy is served without a query"""
+        with (
+            patch(
+                "aind_labtracks_service_server.route.MaterializedViews"
+                ".get_subject_view",
+                return_value=[test_labtracks_subject],
+            ),
+            patch(
+                "aind_labtracks_service_server.handler.SessionHandler"
+                ".get_subject_view"
+            ) as mock_get,
+        ):
+            response = client.get("/subject/632269")
+        assert 200 == response.status_code
+        assert [
+            test_labtracks_subject.model_dump(mode="json")
+        ] == response.json()
+        mock_get.assert_not_called()
+
     def test_500_internal_server_error(
         self, client, get_labtracks_session, caplog
     ):
@@ -42,6 +185,148 @@ class TestSubjectRoute:
 
         assert 500 == response.status_code
 
+    def test_get_200_subject_gzip(
+        self,
+        client,
+        get_labtracks_session,
+        test_labtracks_subject,
+        monkeypatch,
+    ):
+        """Tests cached bodies are served gzip compressed once compressed"""
+        monkeypatch.setattr(get_settings(), "gzip_minimum_size", 10)
+        expected = [test_labtracks_subject.model_dump(mode="json")]
+        for _ in range(2):
+            response = client.get(
+                "/subject/632269", headers={"Accept-Encoding": "gzip"}
+            )
+            assert 200 == response.status_code
+            assert "gzip" == response.headers["content-encoding"]
+            assert "Accept-Encoding" in response.headers["vary"]
+            assert expected == response.json()
+        stats = get_caches()["gzip"].stats()
+        assert (1, 1) == (stats.hits, stats.misses)
+        response = client.get(
+            "/subject/632269", headers={"Accept-Encoding": "identity"}
+        )
+        assert "content-encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert expected == response.json()
+
+    def test_get_304_subject_not_modified(self, client, get_labtracks_session):
+        """Tests a matching If-None-Match header is answered with a 304"""
+        identity = {"Accept-Encoding": "identity"}
+        response = client.get("/subject/632269", headers=identity)
+        etag = response.headers["etag"]
+        assert etag.startswith('"') and etag.endswith('"')
+        response = client.get(
+            "/subject/632269",
+            headers={**identity, "If-None-Match": f'"other", W/{etag}'},
+        )
+        assert 304 == response.status_code
+        assert etag == response.headers["etag"]
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert b"" == response.content
+        assert "max-age=60" == response.headers["cache-control"]
+        response = client.get(
+            "/subject/632269",
+            headers={**identity, "If-None-Match": '"other"'},
+        )
+        assert 200 == response.status_code
+        assert etag == response.headers["etag"]
+        response = client.get(
+            "/subject/632269",
+            params={"fields": "sex"},
+            headers={**identity, "If-None-Match": etag},
+        )
+        assert 200 == response.status_code
+        assert etag != response.headers["etag"]
+
+    def test_get_304_subject_gzip_etag(self, client, get_labtracks_session):
+        """Tests the gzip variant has its own ETag that also validates"""
+        identity_etag = client.get(
+            "/subject/632269", headers={"Accept-Encoding": "identity"}
+        ).headers["etag"]
+        response = client.get(
+            "/subject/632269", headers={"Accept-Encoding": "gzip"}
+        )
+        gzip_etag = response.headers["etag"]
+        assert f'{identity_etag[:-1]}-gzip"' == gzip_etag
+        for accept_encoding, etag in [
+            ("gzip", identity_etag),
+            ("identity", gzip_etag),
+        ]:
+            response = client.get(
+                "/subject/632269",
+                headers={
+                    "Accept-Encoding": accept_encoding,
+                    "If-None-Match": etag,
+                },
+            )
+            assert 304 == response.status_code
+        assert gzip_etag != response.headers["etag"]
+
+
+class TestSubjectsRoute:
+    """Test bulk subjects responses."""
+
+    def test_get_200_subjects(
+        self, client, get_labtracks_session, test_labtracks_subject
+    ):
+        """Tests a good response"""
+        response = client.get(
+            "/subjects", params={"subject_ids": ["632269", "1"]}
+        )
+        assert 200 == response.status_code
+        assert {
+            "632269": [test_labtracks_subject.model_dump(mode="json")],
+            "1": [],
+        } == response.json()
+
+    def test_422_missing_subject_ids(self, client):
+        """Tests that subject_ids are required"""
+        response = client.get("/subjects")
+        assert 422 == response.status_code
+
+    def test_post_200_subjects(
+        self, client, get_labtracks_session, test_labtracks_subject
+    ):
+        """Tests more ids than fit in a URL can be posted"""
+        subject_ids = ["632269"] + [str(i) for i in range(1, 5000)]
+        response = client.post("/subjects", json=subject_ids)
+        assert 200 == response.status_code
+        assert "cache-control" not in response.headers
+        subjects = response.json()
+        assert 5000 == len(subjects)
+        expected = [test_labtracks_subject.model_dump(mode="json")]
+        assert expected == subjects["632269"]
+        assert [] == subjects["1"]
+
+    def test_post_422_subject_ids_not_list(self, client):
+        """Tests that the posted body must be a list of ids"""
+        response = client.post("/subjects", json={"subject_ids": ["632269"]})
+        assert 422 == response.status_code
+
+    def test_422_subject_ids_not_numeric(self, client):
+        """Tests that non-numeric subject ids are rejected"""
+        response = client.get("/subjects", params={"subject_ids": ["abc"]})
+        assert 422 == response.status_code
+        response = client.post("/subjects", json=["632269", "abc"])
+        assert 422 == response.status_code
+
+    def test_500_internal_server_error(
+        self, client, get_labtracks_session, caplog
+    ):
+        """Tests an internal server error response"""
+
+        with patch(
+            "aind_labtracks_service_server.handler.SessionHandler"
+            ".get_subject_views",
+            side_effect=Exception("Something went wrong"),
+        ):
+            response = client.get("/subjects", params={"subject_ids": "1"})
+
+        assert 500 == response.status_code
+
 
 class TestTasksRoute:
     """Test tasks responses."""
@@ -54,6 +339,128 @@ class TestTasksRoute:
         assert 200 == response.status_code
         assert [test_labtracks_task.model_dump(mode="json")] == response.json()
 
+    def test_get_200_tasks_stream(
+        self, client, get_labtracks_session, test_labtracks_task
+    ):
+        """Tests tasks are streamed as ndjson when requested"""
+        expected_line = test_labtracks_task.model_dump_json()
+        response = client.get("/tasks/632269", params={"stream": True})
+        assert 200 == response.status_code
+        assert response.headers["content-type"].startswith(
+            "application/x-ndjson"
+        )
+        assert [expected_line] == response.text.splitlines()
+        response = client.get(
+            "/tasks/632269", headers={"Accept": "application/x-ndjson"}
+        )
+        assert 200 == response.status_code
+        assert [expected_line] == response.text.splitlines()
+
+    def test_get_200_tasks_paginated(self, client, get_labtracks_session):
+        """Tests tasks can be paged through with a cursor"""
+        response = client.get("/tasks/615310", params={"limit": 2})
+        assert 200 == response.status_code
+        assert [2100001, 2100002] == [
+            Decimal(t["id"]) for t in response.json()
+        ]
+        assert "2100002" == response.headers["X-Next-Cursor"]
+        assert (
+            "<http://testserver/tasks/615310?limit=2&after=2100002>; "
+            'rel="next"'
+        ) == response.headers["Link"]
+        response = client.get(
+            "/tasks/615310", params={"limit": 2, "after": 2100002}
+        )
+        assert 200 == response.status_code
+        assert 1 == len(response.json())
+        assert "X-Next-Cursor" not in response.headers
+        response = client.get("/tasks/615310", params={"after": 2100002})
+        assert 1 == len(response.json())
+
+    def test_get_200_tasks_filtered(self, client, get_labtracks_session):
+        """Tests tasks are filtered by query parameters"""
+        response = client.get(
+            "/tasks/615310",
+            params={
+                "type_name": "Surgery",
+                "task_status": "F",
+                "date_start_from": "2021-01-01T00:00:00",
+                "date_start_to": "2021-12-31T00:00:00",
+            },
+        )
+        assert 200 == response.status_code
+        assert [Decimal(2100002)] == [
+            Decimal(t["id"]) for t in response.json()
+        ]
+        response = client.get(
+            "/tasks/615310",
+            params={"type_name": "Surgery", "stream": True},
+        )
+        assert 2 == len(response.text.splitlines())
+
+    def test_get_200_tasks_fields(
+        self, client, get_labtracks_session, test_labtracks_task
+    ):
+        """Tests only the requested fields are returned"""
+        expected = test_labtracks_task.model_dump(
+            mode="json", include={"id", "type_name"}
+        )
+        response = client.get("/tasks/632269", params={"fields": "type_name"})
+        assert 200 == response.status_code
+        assert [expected] == response.json()
+        response = client.get(
+            "/tasks/632269", params={"fields": "type_name", "stream": True}
+        )
+        assert [expected] == [
+            json.loads(line) for line in response.text.splitlines()
+        ]
+        response = client.get(
+            "/tasks/615310", params={"fields": "task_status", "limit": 1}
+        )
+        assert [(Decimal(2100001), "F")] == [
+            (Decimal(t["id"]), t["task_status"]) for t in response.json()
+        ]
+        assert {"id", "task_status"} == set(response.json()[0])
+        response = client.get("/tasks/632269", params={"fields": "color"})
+        assert 422 == response.status_code
+
+    def test_get_200_tasks_materialized(self, client, test_labtracks_task):
+        """Tests a fresh materialized copy is served without a query"""
+        with (
+            patch(
+                "aind_labtracks_service_server.route.MaterializedViews"
+                ".get_task_view",
+                return_value=[test_labtracks_task],
+            ),
+            patch(
+                "aind_labtracks_service_server.handler.SessionHandler"
+                ".get_task_view"
+            ) as mock_get,
+        ):
+            response = client.get("/tasks/632269")
+        assert 200 == response.status_code
+        assert [test_labtracks_task.model_dump(mode="json")] == response.json()
+        mock_get.assert_not_called()
+
+    def test_422_invalid_limit(self, client):
+        """Tests limit must be positive"""
+        response = client.get("/tasks/615310", params={"limit": 0})
+        assert 422 == response.status_code
+
+    def test_get_200_tasks_cached(
+        self, client, get_labtracks_session, test_labtracks_task
+    ):
+        """Tests a repeated request is served from the cache"""
+        with patch(
+            "aind_labtracks_service_server.handler.SessionHandler"
+            ".get_task_view",
+            return_value=[test_labtracks_task],
+        ) as mock_get:
+            client.get("/tasks/632269")
+            response = client.get("/tasks/632269")
+        assert 200 == response.status_code
+        mock_get.assert_called_once()
+
     def test_500_internal_server_error(
         self, client, get_labtracks_session, caplog
     ):
@@ -68,6 +475,222 @@ class TestTasksRoute:
 
         assert 500 == response.status_code
 
+    def test_tasks_cache_headers(self, client, get_labtracks_session):
+        """Tests task responses can be cached and vary on Accept"""
+        for params in [{}, {"stream": True}, {"limit": 5}]:
+            response = client.get("/tasks/632269", params=params)
+            assert 200 == response.status_code
+            assert "max-age=60" == response.headers["cache-control"]
+            assert "Accept" in response.headers["vary"].split(", ")
+        response = client.get("/tasks", params={"subject_ids": ["632269"]})
+        assert "max-age=60" == response.headers["cache-control"]
+        assert "Accept" not in response.headers.get("vary", "")
+
+    def test_get_304_tasks_not_modified(self, client, get_labtracks_session):
+        """Tests a matching If-None-Match header is answered with a 304"""
+        etag = client.get("/tasks/632269").headers["etag"]
+        response = client.get("/tasks/632269", headers={"If-None-Match": etag})
+        assert 304 == response.status_code
+        response = client.get("/tasks/632269", headers={"If-None-Match": "*"})
+        assert 304 == response.status_code
+        response = client.get(
+            "/tasks/632269",
+            params={"limit": 1},
+            headers={"If-None-Match": etag},
+        )
+        assert 304 == response.status_code
+
+    def test_get_304_tasks_weak_etag(
+        self, client, get_labtracks_session, monkeypatch
+    ):
+        """Tests bodies left to the middleware get a weak ETag"""
+        monkeypatch.setattr(get_settings(), "gzip_minimum_size", 10)
+        params = {"limit": 1}
+        response = client.get("/tasks/632269", params=params)
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+        response = client.get(
+            "/tasks/632269", params=params, headers={"If-None-Match": etag}
+        )
+        assert 304 == response.status_code
+        assert etag == response.headers["etag"]
+        assert "Accept-Encoding" in response.headers["vary"].split(", ")
+
+
+class TestTasksForSubjectsRoute:
+    """Test bulk tasks responses."""
+
+    def test_get_200_tasks(
+        self, client, get_labtracks_session, test_labtracks_task
+    ):
+        """Tests a good response"""
+        response = client.get(
+            "/tasks", params={"subject_ids": ["632269", "623236"]}
+        )
+        assert 200 == response.status_code
+        assert {
+            "632269": [test_labtracks_task.model_dump(mode="json")],
+            "623236": [],
+        } == response.json()
+
+    def test_422_subject_ids_not_numeric(self, client):
+        """Tests that non-numeric subject ids are rejected"""
+        response = client.get("/tasks", params={"subject_ids": ["abc"]})
+        assert 422 == response.status_code
+        response = client.post("/tasks", json=["632269", "abc"])
+        assert 422 == response.status_code
+
+    def test_post_200_tasks(
+        self, client, get_labtracks_session, test_labtracks_task
+    ):
+        """Tests tasks for posted subject ids are returned"""
+        response = client.post("/tasks", json=["632269", "623236"])
+        assert 200 == response.status_code
+        assert {
+            "632269": [test_labtracks_task.model_dump(mode="json")],
+            "623236": [],
+        } == response.json()
+
+    def test_500_internal_server_error(
+        self, client, get_labtracks_session, caplog
+    ):
+        """Tests an internal server error response"""
+
+        with patch(
+            "aind_labtracks_service_server.handler.SessionHandler"
+            ".get_task_views",
+            side_effect=Exception("Something went wrong"),
+        ):
+            response = client.get("/tasks", params={"subject_ids": "1"})
+
+        assert 500 == response.status_code
+
+
+class TestChangesRoute:
+    """Test change feed responses."""
+
+    def test_get_200_changes(
+        self, client, get_labtracks_session, test_labtracks_subject
+    ):
+        """Tests a good response"""
+        response = client.get("/changes", params={"since": "2024-01-01"})
+        assert 200 == response.status_code
+        assert {
+            "since": "2024-01-01T00:00:00",
+            "watermark": "2025-02-28T12:08:05.173000",
+            "subject_ids": [632269],
+            "task_subject_ids": [615310, 632269],
+            "subjects": None,
+            "tasks": None,
+        } == response.json()
+        response = client.get(
+            "/changes",
+            params={"since": "2024-01-01", "include_views": True},
+        )
+        assert 200 == response.status_code
+        assert {
+            "632269": [test_labtracks_subject.model_dump(mode="json")]
+        } == response.json()["subjects"]
+        assert ["615310", "632269"] == sorted(response.json()["tasks"])
+
+    def test_get_200_changes_overlap(self, client, get_labtracks_session):
+        """Tests changes just before since are returned again"""
+        params = {"since": "2025-02-28T12:09:00"}
+        response = client.get("/changes", params=params)
+        assert [615310, 632269] == response.json()["task_subject_ids"]
+        with patch.object(get_settings(), "row_modified_overlap", 0):
+            response = client.get("/changes", params=params)
+        assert [] == response.json()["task_subject_ids"]
+
+    def test_422_missing_since(self, client):
+        """Tests since is required"""
+        response = client.get("/changes")
+        assert 422 == response.status_code
+
+    def test_500_internal_server_error(
+        self, client, get_labtracks_session, caplog
+    ):
+        """Tests an internal server error response"""
+
+        with patch(
+            "aind_labtracks_service_server.handler.SessionHandler"
+            ".get_changes",
+            side_effect=Exception("Something went wrong"),
+        ):
+            response = client.get("/changes", params={"since": "2024-01-01"})
+
+        assert 500 == response.status_code
+
+
+class TestAsyncQueries:
+    """Test subject and task responses read with the async session."""
+
+    @pytest.fixture(autouse=True)
+    def no_sync_views(self):
+        """Fail if the sync session is used for subject or task views."""
+        error = Exception("The sync session was used")
+        with (
+            patch(
+                "aind_labtracks_service_server.handler.SessionHandler"
+                ".get_subject_view",
+                side_effect=error,
+            ),
+            patch(
+                "aind_labtracks_service_server.handler.SessionHandler"
+                ".get_task_view",
+                side_effect=error,
+            ),
+        ):
+            yield
+
+    def test_get_200_subject(self, async_client, test_labtracks_subject):
+        """Tests a subject is read with the async session and cached"""
+        response = async_client.get("/subject/632269")
+        assert 200 == response.status_code
+        assert [test_labtracks_subject.model_dump(mode="json")] == (
+            response.json()
+        )
+        assert "max-age=60" == response.headers["cache-control"]
+        response = async_client.get(
+            "/subject/632269",
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert 304 == response.status_code
+        assert 1 == get_caches()["subject"].stats().hits
+        response = async_client.get(
+            "/subject/632269", params={"fields": "sex"}
+        )
+        assert [{"id", "sex"}] == [set(s) for s in response.json()]
+
+    def test_get_200_tasks(self, async_client, test_labtracks_task):
+        """Tests tasks are read with the async session and cached"""
+        response = async_client.get("/tasks/632269")
+        assert 200 == response.status_code
+        assert [test_labtracks_task.model_dump(mode="json")] == (
+            response.json()
+        )
+        assert "Accept" in response.headers["vary"].split(", ")
+        async_client.get("/tasks/632269")
+        assert 1 == get_caches()["tasks"].stats().hits
+
+    def test_get_200_tasks_paginated(self, async_client):
+        """Tests task pages and filters are read with the async session"""
+        response = async_client.get("/tasks/615310", params={"limit": 2})
+        assert 200 == response.status_code
+        assert 2 == len(response.json())
+        assert "2100002" == response.headers["X-Next-Cursor"]
+        response = async_client.get(
+            "/tasks/615310", params={"type_name": "Surgery"}
+        )
+        assert 2 == len(response.json())
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_get_200_tasks_stream(self, async_client):
+        """Tests streamed tasks are still read from the sync cursor"""
+        response = async_client.get("/tasks/615310", params={"stream": True})
+        assert 200 == response.status_code
+        assert 3 == len(response.text.splitlines())
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,8 +1,26 @@
 """Tests session module"""
 
+import logging
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
 import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
 
-from aind_labtracks_service_server.session import get_session
+from aind_labtracks_service_server.session import (
+    add_query_listeners,
+    get_async_engine,
+    get_async_session,
+    get_engine,
+    get_session,
+    get_settings,
+    prewarm_engine,
+    statement_fingerprint,
+)
 
 
 class TestSession:
@@ -20,6 +38,127 @@ class TestSession:
         )
         assert expected_bind_url == bind_url
 
+    async def test_get_async_session(self):
+        """Tests get_async_session method"""
+
+        session_generator = get_async_session()
+        assert await anext(session_generator) is None
+        await session_generator.aclose()
+        with patch.object(get_settings(), "async_queries", True):
+            session_generator = get_async_session()
+            session = await anext(session_generator)
+            bind_url = str(session.bind.url)
+            await session_generator.aclose()
+        expected_bind_url = (
+            "mssql+aioodbc://lb_user:***@lb_host:123/"
+            "lb_db?driver=FreeTDS&tds_version=8.0"
+        )
+        assert expected_bind_url == bind_url
+        assert get_async_engine() is session.bind
+
+    def test_engine_pool(self):
+        """Tests engine pool is configured from settings"""
+
+        engine = get_engine()
+        assert engine is get_engine()
+        assert 5 == engine.pool.size()
+        assert 30 == engine.pool.timeout()
+        assert -1 == engine.pool._recycle
+        assert engine.pool._pre_ping is False
+
+
+class TestQueryListeners:
+    """Test statement timing and slow query logging"""
+
+    def test_statement_fingerprint(self):
+        """Tests fingerprints ignore whitespace, literals and IN lists"""
+
+        assert statement_fingerprint(
+            "SELECT a FROM t WHERE a IN (?, ?)"
+        ) == statement_fingerprint("SELECT a\nFROM t WHERE a IN (?)")
+        assert statement_fingerprint(
+            "SELECT TOP 5 a FROM t WHERE a IN (1, 2)"
+        ) == statement_fingerprint("SELECT TOP 7 a FROM t WHERE a IN (3)")
+        assert statement_fingerprint(
+            "SELECT a FROM t"
+        ) != statement_fingerprint("SELECT b FROM t")
+
+    def test_slow_query_logged(self, caplog):
+        """Tests queries over the threshold are logged"""
+
+        sqlite_engine = create_engine("sqlite://")
+        add_query_listeners(sqlite_engine)
+        statement = "SELECT 1"
+        with (
+            caplog.at_level(logging.WARNING),
+            sqlite_engine.connect() as conn,
+        ):
+            conn.execute(text(statement))
+            assert "Slow query" not in caplog.text
+            with patch.object(get_settings(), "slow_query_threshold", -1):
+                conn.execute(text(statement))
+                conn.execute(
+                    text(statement),
+                    execution_options={"query": "subject_view"},
+                )
+        fingerprint = statement_fingerprint(statement)
+        assert f"Slow query other {fingerprint} took" in caplog.text
+        assert f"Slow query subject_view {fingerprint} took" in caplog.text
+        assert "s: SELECT 1" in caplog.text
+
+    def test_statement_labeled_by_query(self):
+        """Tests statement durations are labeled by the query option"""
+
+        sqlite_engine = create_engine("sqlite://")
+        add_query_listeners(sqlite_engine)
+        labels = {"query": "subject_views"}
+        before = REGISTRY.get_sample_value(
+            "labtracks_statement_duration_seconds_count", labels
+        )
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"), execution_options=labels)
+        assert (before or 0) + 1 == REGISTRY.get_sample_value(
+            "labtracks_statement_duration_seconds_count", labels
+        )
+
+    def test_prewarm_engine(self):
+        """Tests connections are opened and returned to the pool"""
+
+        sqlite_engine = create_engine(
+            "sqlite://", poolclass=QueuePool, pool_size=3
+        )
+        assert 3 == prewarm_engine(sqlite_engine, 3)
+        assert 3 == sqlite_engine.pool.checkedin()
+        assert 0 == sqlite_engine.pool.checkedout()
+
+    def test_prewarm_engine_error(self, caplog, tmp_path):
+        """Tests connection errors are logged rather than raised"""
+
+        sqlite_engine = create_engine(
+            f"sqlite:///{tmp_path / 'missing' / 'labtracks.db'}"
+        )
+        with caplog.at_level(logging.WARNING):
+            assert 0 == prewarm_engine(sqlite_engine, 2)
+        assert "Prewarming the pool stopped after 0 connections" in (
+            caplog.text
+        )
+
+    def test_import_without_settings(self):
+        """Tests the app and its openapi spec load without any settings"""
+
+        env = {
+            k: v
+            for k, v in os.environ.items()
+            if not k.startswith("LABTRACKS")
+        }
+        code = (
+            "from aind_labtracks_service_server.main import app\n"
+            "from aind_labtracks_service_server.session import get_settings\n"
+            "assert app.openapi()['paths']\n"
+            "assert get_settings.cache_info().currsize == 0\n"
+        )
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
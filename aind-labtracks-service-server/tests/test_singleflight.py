@@ -0,0 +1,156 @@
+"""Tests singleflight module"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from aind_labtracks_service_server.singleflight import SingleFlight
+
+
+@pytest.fixture
+def coalesced():
+    """Semaphore released each time a call waits on a call in flight."""
+    waiting = threading.Semaphore(0)
+    with patch(
+        "aind_labtracks_service_server.singleflight.COALESCED_CALLS"
+    ) as mock_counter:
+        mock_counter.labels.return_value.inc.side_effect = waiting.release
+        yield waiting, mock_counter
+
+
+def _value(value):
+    """Coroutine function that returns a value."""
+
+    async def func():
+        """Return the value."""
+        return value
+
+    return func
+
+
+class TestSingleFlight:
+    """Test methods in SingleFlight class"""
+
+    def test_do_coalesces_concurrent_calls(self, coalesced):
+        """Tests concurrent calls for a key share one call and its result"""
+        waiting, mock_counter = coalesced
+        flight = SingleFlight("subject_view")
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            """Block until released."""
+            calls.append(1)
+            started.set()
+            release.wait()
+            return ["result"]
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            leader = executor.submit(flight.do, 1, func)
+            assert started.wait(timeout=5)
+            followers = [executor.submit(flight.do, 1, func) for _ in range(3)]
+            for _ in range(3):
+                assert waiting.acquire(timeout=5)
+            other = executor.submit(flight.do, 2, lambda: ["other"])
+            assert ["other"] == other.result(timeout=5)
+            release.set()
+            results = [f.result(timeout=5) for f in [leader] + followers]
+        assert [["result"]] * 4 == results
+        assert results[0] is results[1]
+        assert 1 == len(calls)
+        mock_counter.labels.assert_called_with("subject_view")
+        assert ["again"] == flight.do(1, lambda: ["again"])
+
+    def test_do_shares_error(self, coalesced):
+        """Tests calls waiting on a failed call raise its error"""
+        waiting, _ = coalesced
+        flight = SingleFlight("task_view")
+        started = threading.Event()
+        release = threading.Event()
+
+        def func():
+            """Fail once released."""
+            started.set()
+            release.wait()
+            raise ValueError("Something went wrong")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, 1, func)
+            assert started.wait(timeout=5)
+            follower = executor.submit(flight.do, 1, func)
+            assert waiting.acquire(timeout=5)
+            release.set()
+            for future in [leader, follower]:
+                with pytest.raises(ValueError):
+                    future.result(timeout=5)
+        assert 1 == flight.do(1, lambda: 1)
+
+    async def test_do_async_coalesces_concurrent_calls(self, coalesced):
+        """Tests concurrent coroutines for a key share one call"""
+        _, mock_counter = coalesced
+        flight = SingleFlight("subject_view")
+        release = asyncio.Event()
+        calls = []
+
+        async def func():
+            """Wait until released."""
+            calls.append(1)
+            await release.wait()
+            return ["result"]
+
+        tasks = [
+            asyncio.create_task(flight.do_async(1, func)) for _ in range(3)
+        ]
+        other = await flight.do_async(2, _value(["other"]))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert ["other"] == other
+        assert [["result"]] * 3 == results
+        assert 1 == len(calls)
+        assert 2 == mock_counter.labels.return_value.inc.call_count
+        assert ["again"] == await flight.do_async(1, _value(["again"]))
+
+    async def test_do_async_shares_error(self, coalesced):
+        """Tests coroutines waiting on a failed call raise its error"""
+        flight = SingleFlight("task_view")
+        release = asyncio.Event()
+
+        async def func():
+            """Fail once released."""
+            await release.wait()
+            raise ValueError("Something went wrong")
+
+        tasks = [
+            asyncio.create_task(flight.do_async(1, func)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        with pytest.raises(ValueError):
+            await flight.do_async(1, func)
+
+    async def test_do_async_cancelled(self, coalesced):
+        """Tests waiters are cancelled along with the call"""
+        flight = SingleFlight("task_view")
+        started = asyncio.Event()
+
+        async def func():
+            """Wait until cancelled."""
+            started.set()
+            await asyncio.Event().wait()
+
+        leader = asyncio.create_task(flight.do_async(1, func))
+        await started.wait()
+        follower = asyncio.create_task(flight.do_async(1, func))
+        await asyncio.sleep(0)
+        leader.cancel()
+        for task in [leader, follower]:
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        assert 1 == await flight.do_async(1, _value(1))